@@ -1,62 +1,31 @@
-from queue import Queue
 import time
 import logging
-from typing import Optional, Dict, Any
+import functools
+from typing import Optional, Dict, Any, List
 import hashlib
+import gzip
 import os
-import pickle
 
 from qgis.core import QgsNetworkAccessManager, QgsNetworkReplyContent
-from qgis.PyQt.QtCore import QUrl, QByteArray
+from qgis.PyQt.QtCore import QUrl, QByteArray, QEventLoop, QTimer, QRunnable, QThreadPool
 from qgis.PyQt.QtNetwork import QNetworkRequest, QNetworkReply
 
-class ConnectionPool:
-    """Connection pool optimized for medium-speed connections like 4G"""
-    
-    def __init__(self, max_size: int = 8, timeout: int = 5):
-        self.pool = Queue(maxsize=max_size)
-        self.timeout = timeout
-        self.logger = logging.getLogger(__name__)
-        self._fill_pool()
-        
-    def _fill_pool(self):
-        """Initialize the connection pool with network managers"""
-        while not self.pool.full():
-            # Using QgsNetworkAccessManager instead of requests.Session
-            # Since QgsNetworkAccessManager is a singleton, we'll store
-            # the main instance with some additional metadata for tracking
-            network_manager = {
-                'manager': QgsNetworkAccessManager.instance(),
-                'created_at': time.time()
-            }
-            self.pool.put(network_manager)
-            
-    def get_manager(self) -> Dict:
-        """Get a network manager from the pool with timeout"""
-        try:
-            return self.pool.get(timeout=self.timeout)
-        except:
-            self.logger.warning("Connection pool timeout, creating new manager")
-            return {
-                'manager': QgsNetworkAccessManager.instance(),
-                'created_at': time.time()
-            }
-            
-    def return_manager(self, manager_dict: Dict):
-        """Return a manager to the pool"""
-        try:
-            # Check if manager is older than 5 minutes, if so create a new one
-            if time.time() - manager_dict.get('created_at', 0) > 300:  # 5 minutes
-                # Just get a fresh instance instead
-                self.pool.put({
-                    'manager': QgsNetworkAccessManager.instance(),
-                    'created_at': time.time()
-                })
-            else:
-                self.pool.put(manager_dict, block=False)
-        except:
-            # Pool is full, just let the reference go
-            pass
+from . import jsonutil
+from .infrastructure.cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=256)
+def _cache_key(url: str, header_items: frozenset) -> str:
+    """Build the HTTP cache key for a URL and its request headers"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(url.encode())
+    for name, value in sorted(header_items):
+        h.update(b'\0')
+        h.update(name.encode())
+        h.update(b'=')
+        h.update(str(value).encode())
+    return h.hexdigest()
 
 class QgisResponse:
     """Simple wrapper to provide compatibility with requests Response objects"""
@@ -85,20 +54,45 @@ class QgisResponse:
         http_status = reply_content.attribute(QNetworkRequest.HttpStatusCodeAttribute)
         if http_status:
             self.status_code = http_status
+    
+    @functools.cached_property
+    def headers(self) -> Dict[str, str]:
+        """Get response headers, read from the reply on first access"""
+        return {
+            bytes(name).decode('utf-8', 'replace'): bytes(value).decode('utf-8', 'replace')
+            for name, value in self.reply_content.rawHeaderPairs()
+        }
+    
+    def to_dict(self, compress: bool = False) -> Dict:
+        """
+        Serialize the response fields to a plain dictionary for caching
         
-        # Headers
-        self.headers = {}
-        for header in reply_content.rawHeaderList():
-            header_name = bytes(header).decode('utf-8')
-            header_value = bytes(reply_content.rawHeader(header)).decode('utf-8')
-            self.headers[header_name] = header_value
+        Args:
+            compress: Store the body gzip-compressed (level 1)
+        """
+        return {
+            'status': self.status_code,
+            'headers': self.headers,
+            'content': gzip.compress(self.content, compresslevel=1) if compress else self.content,
+            'compressed': compress
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QgisResponse':
+        """Rebuild a response from a dictionary created by to_dict"""
+        response = cls.__new__(cls)
+        response.reply_content = None
+        response._text = None
+        response._content = gzip.decompress(data['content']) if data.get('compressed') else data['content']
+        response.status_code = data['status']
+        response.headers = data['headers']
+        return response
     
     @property
     def text(self) -> str:
         """Get response text"""
         if self._text is None:
-            content = self.reply_content.content()
-            self._text = bytes(content).decode('utf-8')
+            self._text = self.content.decode('utf-8')
         return self._text
     
     @property
@@ -110,67 +104,104 @@ class QgisResponse:
         
     def json(self) -> Dict:
         """Parse response content as JSON"""
-        import json
-        return json.loads(self.text)
+        # Parse the raw bytes unless the decoded text already exists
+        if self._text is not None:
+            return jsonutil.loads(self._text)
+        return jsonutil.loads(self.content)
         
     def raise_for_status(self):
         """Raise an exception if status code indicates an error"""
         if self.status_code >= 400:
             raise Exception(f"HTTP Error {self.status_code}")
 
+class _CallableRunnable(QRunnable):
+    """Runs a Python callable on a QThreadPool worker thread"""
+    
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+        
+    def run(self):
+        self.func()
+
 class ConnectionManager:
     """Manages connections and caching for network requests"""
     
     def __init__(self, cache_dir: str = None):
-        self.pool = ConnectionPool()
         self.cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.qgis_cache')
-        os.makedirs(self.cache_dir, exist_ok=True)
-        self.logger = logging.getLogger(__name__)
+        self._http_cache = DiskCache(self.cache_dir)
+        self.logger = logger
         self._connection_quality = None
         self._last_quality_check = 0
+        self._quality_probe_running = False
         
     def detect_connection_quality(self, force: bool = False) -> str:
         """
         Detect connection quality and cache result for 5 minutes
+        
+        Unless force is set, a stale or missing result is refreshed by a
+        probe on a background thread and the last known quality ("MEDIUM"
+        before the first probe completes) is returned immediately.
+        
         Returns: "SLOW", "MEDIUM", or "FAST"
         """
         now = time.time()
         if not force and self._connection_quality and (now - self._last_quality_check) < 300:
             return self._connection_quality
             
+        if force:
+            return self._probe_connection_quality()
+            
+        if not self._quality_probe_running:
+            self._quality_probe_running = True
+            QThreadPool.globalInstance().start(_CallableRunnable(self._run_quality_probe))
+            
+        return self._connection_quality or "MEDIUM"
+        
+    def _run_quality_probe(self):
+        """Background entry point for the connection quality probe"""
+        try:
+            self._probe_connection_quality()
+        finally:
+            self._quality_probe_running = False
+            
+    def _probe_connection_quality(self) -> str:
+        """
+        Measure connection quality with a synchronous request
+        Returns: "SLOW", "MEDIUM", or "FAST"
+        """
+        now = time.time()
         try:
             start = time.time()
-            manager_dict = self.pool.get_manager()
-            manager = manager_dict['manager']
             
-            try:
-                # Create request
-                request = QNetworkRequest(QUrl("https://www.google.com"))
-                request.setHeader(QNetworkRequest.UserAgentHeader, "QGIS Network Test")
-                
-                # Make sync request
-                reply = manager.blockingGet(request)
+            # QgsNetworkAccessManager is a singleton, so use it directly
+            manager = QgsNetworkAccessManager.instance()
+            
+            # Create request
+            request = QNetworkRequest(QUrl("https://www.google.com"))
+            request.setHeader(QNetworkRequest.UserAgentHeader, "QGIS Network Test")
+            
+            # Make sync request
+            reply = manager.blockingGet(request)
+            
+            # Check if request was successful
+            if reply.error() == QNetworkReply.NoError:
+                latency = time.time() - start
                 
-                # Check if request was successful
-                if reply.error() == QNetworkReply.NoError:
-                    latency = time.time() - start
-                    
-                    if latency > 0.5:  # High latency
-                        quality = "SLOW"
-                    elif latency > 0.2:
-                        quality = "MEDIUM"
-                    else:
-                        quality = "FAST"
-                        
-                    self._connection_quality = quality
-                    self._last_quality_check = now
-                    return quality
+                if latency > 0.5:  # High latency
+                    quality = "SLOW"
+                elif latency > 0.2:
+                    quality = "MEDIUM"
                 else:
-                    self.logger.warning(f"Connection quality check failed: {reply.errorString()}")
-                    return "SLOW"
+                    quality = "FAST"
                     
-            finally:
-                self.pool.return_manager(manager_dict)
+                self._connection_quality = quality
+                self._last_quality_check = now
+                return quality
+            else:
+                self.logger.warning(f"Connection quality check failed: {reply.errorString()}")
+                return "SLOW"
+                
         except Exception as e:
             self.logger.warning(f"Connection quality check failed: {str(e)}")
             return "SLOW"
@@ -188,64 +219,110 @@ class ConnectionManager:
         Returns:
             QgisResponse: Response data
         """
-        # Generate cache key from URL and headers
-        cache_key = hashlib.md5(
-            (url + str(sorted((headers or {}).items()))).encode()
-        ).hexdigest()
-        cache_file = os.path.join(self.cache_dir, cache_key)
+        return self.fetch_many([url], headers, cache_ttl)[0]
         
-        # Check cache first
-        if os.path.exists(cache_file):
-            if time.time() - os.path.getmtime(cache_file) < cache_ttl:
-                try:
-                    with open(cache_file, 'rb') as f:
-                        return pickle.load(f)
-                except:
-                    self.logger.warning("Cache read failed, fetching fresh")
+    def fetch_many(self, urls: List[str], headers: Optional[Dict] = None,
+                   cache_ttl: int = 300) -> List[QgisResponse]:
+        """
+        Fetch several URLs concurrently with caching
         
-        # Add default headers
-        headers = headers or {}
-        if 'Accept-Encoding' not in headers:
-            headers['Accept-Encoding'] = 'gzip, deflate'
+        All uncached requests are issued at once and the call returns when
+        every reply has finished, so the wall time is that of the slowest
+        request instead of the sum of all of them.
+        
+        Args:
+            urls: URLs to fetch
+            headers: Optional request headers applied to every request
+            cache_ttl: Cache time-to-live in seconds
+            
+        Returns:
+            List[QgisResponse]: Responses in the same order as urls
+        """
+        header_items = frozenset(headers.items()) if headers else frozenset()
+        responses = [None] * len(urls)
+        pending = {}
+        
+        # Check cache first
+        for index, url in enumerate(urls):
+            cache_key = _cache_key(url, header_items)
+            cached = self._http_cache.get(cache_key)
+            if cached is not None:
+                responses[index] = QgisResponse.from_dict(cached)
+            else:
+                pending[index] = (url, cache_key)
+                
+        if not pending:
+            return responses
         
         # Get connection quality-based timeout
         quality = self.detect_connection_quality()
         timeout = 5000 if quality == "SLOW" else 10000  # in milliseconds for Qt
         
-        # Make request
-        manager_dict = self.pool.get_manager()
-        manager = manager_dict['manager']
+        # Issue all requests without blocking
+        manager = QgsNetworkAccessManager.instance()
+        loop = QEventLoop()
+        remaining = [len(pending)]
         
-        try:
-            # Create request object
-            request = QNetworkRequest(QUrl(url))
-            
-            # Set timeout
-            request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.PreferNetwork)
-            request.setAttribute(QNetworkRequest.RedirectPolicyAttribute, QNetworkRequest.NoLessSafeRedirectPolicy)
-            
-            # Set headers
-            for header_name, header_value in headers.items():
-                request.setRawHeader(
-                    QByteArray(header_name.encode()), 
-                    QByteArray(str(header_value).encode())
-                )
-            
-            # Make blocking request
-            reply = manager.blockingGet(request, timeoutMs=timeout)
+        def on_finished():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                loop.quit()
+        
+        replies = {}
+        for index, (url, _) in pending.items():
+            reply = manager.get(self._build_request(url, headers))
+            reply.finished.connect(on_finished)
+            replies[index] = reply
             
+        # Wait for all replies or the timeout, whichever comes first
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        timer.start(timeout)
+        if remaining[0] > 0:
+            loop.exec_()
+        timer.stop()
+        
+        for index, reply in replies.items():
+            if not reply.isFinished():
+                self.logger.warning(f"Request timed out: {pending[index][0]}")
+                reply.abort()
+                
             # Create response object
-            response = QgisResponse(reply)
+            reply_content = QgsNetworkReplyContent(reply)
+            reply_content.setContent(reply.readAll())
+            response = QgisResponse(reply_content)
+            reply.deleteLater()
             
             # Cache successful response
             if response.status_code < 400:
                 try:
-                    with open(cache_file, 'wb') as f:
-                        pickle.dump(response, f)
+                    self._http_cache.set(pending[index][1], response.to_dict(compress=True), expire=cache_ttl)
                 except:
                     self.logger.warning("Failed to cache response")
                     
-            return response
+            responses[index] = response
             
-        finally:
-            self.pool.return_manager(manager_dict) 
\ No newline at end of file
+        return responses
+        
+    def _build_request(self, url: str, headers: Optional[Dict] = None) -> QNetworkRequest:
+        """
+        Create a network request with caching policy and headers applied
+        
+        Args:
+            url: URL to request
+            headers: Request headers (optional)
+            
+        Returns:
+            QNetworkRequest: Prepared request
+        """
+        request = QNetworkRequest(QUrl(url))
+        request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.PreferNetwork)
+        request.setAttribute(QNetworkRequest.RedirectPolicyAttribute, QNetworkRequest.NoLessSafeRedirectPolicy)
+        
+        for header_name, header_value in (headers or {}).items():
+            request.setRawHeader(
+                QByteArray(header_name.encode()), 
+                QByteArray(str(header_value).encode())
+            )
+        return request
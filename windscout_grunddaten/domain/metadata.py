@@ -5,12 +5,60 @@ This module contains the business logic for handling metadata.
 """
 from typing import Dict, Optional
 import logging
-import json
+import functools
 from datetime import datetime
 
-from qgis.core import QgsLayerMetadata, QgsBox3d, QgsDateTimeRange
+from qgis.core import QgsLayerMetadata, QgsBox3d, QgsDateTimeRange, QgsObjectCustomProperties
 
 from .models import LayerMetadata
+from .. import jsonutil
+
+# C implementation of ISO 8601 parsing, when installed in the QGIS Python environment
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    _parse_datetime = datetime.fromisoformat
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, memoized.
+    
+    Layers of one service usually share the same temporal bounds, so the
+    same strings are parsed over and over.
+    
+    Args:
+        value: ISO 8601 timestamp
+        
+    Returns:
+        datetime: Parsed timestamp
+    """
+    return _parse_datetime(value)
+
+
+def set_custom_properties(layer, properties: Dict) -> None:
+    """
+    Set several custom properties on a layer in one call.
+    
+    Existing properties are kept. Falls back to one setCustomProperty call
+    per key on QGIS versions without QgsMapLayer.setCustomProperties.
+    
+    Args:
+        layer: QGIS layer object
+        properties: Properties to set
+    """
+    if not properties:
+        return
+        
+    if hasattr(layer, 'setCustomProperties') and hasattr(layer, 'customProperties'):
+        props = QgsObjectCustomProperties(layer.customProperties())
+        for key, value in properties.items():
+            props.setValue(key, value)
+        layer.setCustomProperties(props)
+    else:
+        for key, value in properties.items():
+            layer.setCustomProperty(key, value)
 
 
 class MetadataProcessor:
@@ -65,12 +113,12 @@ class MetadataProcessor:
             try:
                 if 'interval' in metadata.temporal_extent:
                     interval = metadata.temporal_extent['interval']
-                    start = datetime.fromisoformat(interval[0])
-                    end = datetime.fromisoformat(interval[1])
+                    start = _parse_iso(interval[0])
+                    end = _parse_iso(interval[1])
                     qmd.setTemporalExtents([QgsDateTimeRange(start, end)])
                 elif all(k in metadata.temporal_extent for k in ('start', 'end')):
-                    start = datetime.fromisoformat(metadata.temporal_extent['start'])
-                    end = datetime.fromisoformat(metadata.temporal_extent['end'])
+                    start = _parse_iso(metadata.temporal_extent['start'])
+                    end = _parse_iso(metadata.temporal_extent['end'])
                     qmd.setTemporalExtents([QgsDateTimeRange(start, end)])
             except (ValueError, KeyError, IndexError) as e:
                 self.logger.warning(f"Error setting temporal extent: {e}")
@@ -95,9 +143,10 @@ class MetadataProcessor:
         if not layer or not hasattr(layer, 'setCustomProperty'):
             return
             
-        for key, value in metadata.custom_properties.items():
-            if value:  # Only set non-empty values
-                layer.setCustomProperty(key, value)
+        # Only set non-empty values
+        set_custom_properties(layer, {
+            key: value for key, value in metadata.custom_properties.items() if value
+        })
                 
     def prepare_metadata_deferred(self, layer, service_config=None, layer_config=None) -> None:
         """
@@ -112,7 +161,7 @@ class MetadataProcessor:
             return
             
         # Store minimal information for later use
-        layer.setCustomProperty('pending_metadata', json.dumps({
+        layer.setCustomProperty('pending_metadata', jsonutil.dumps({
             'service_id': service_config.get('id') if service_config else '',
             'layer_id': layer_config.get('id') if layer_config else ''
         })) 
\ No newline at end of file
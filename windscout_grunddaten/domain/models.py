@@ -3,12 +3,28 @@ Domain models for WindScout Grunddaten Plugin
 
 This module contains the core data models used throughout the plugin.
 """
+import sys
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from datetime import datetime
 
 
-@dataclass
+# slots=True is only accepted from Python 3.10 on; older QGIS builds
+# ship an earlier interpreter and keep the regular __dict__ instances
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+_CUSTOM_PROPERTY_KEYS = ('quality', 'updated', 'data_uri')
+
+
+def _as_list(data: Dict, single_key: str, list_key: str) -> List:
+    """Return [data[single_key]] if set, otherwise data[list_key] or a new empty list"""
+    value = data.get(single_key)
+    if value:
+        return [value]
+    return data.get(list_key) or []
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LayerMetadata:
     """Model representing layer metadata"""
     identifier: str = ""
@@ -27,19 +43,15 @@ class LayerMetadata:
             identifier=data.get('id', data.get('identifier', '')),
             title=data.get('title', ''),
             abstract=data.get('description', data.get('abstract', '')),
-            licenses=[data.get('license')] if 'license' in data else data.get('licenses', []),
-            rights=[data.get('attribution')] if 'attribution' in data else data.get('rights', []),
+            licenses=_as_list(data, 'license', 'licenses'),
+            rights=_as_list(data, 'attribution', 'rights'),
             extent=data.get('extent', {}),
             temporal_extent=data.get('temporal_extent', {}),
-            custom_properties={
-                'quality': data.get('quality', ''),
-                'updated': data.get('updated', ''),
-                'data_uri': data.get('data_uri', '')
-            }
+            custom_properties={key: data[key] for key in _CUSTOM_PROPERTY_KEYS if data.get(key)}
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ServiceConfig:
     """Model representing service configuration"""
     id: str
@@ -64,7 +76,7 @@ class ServiceConfig:
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LayerConfig:
     """Model representing layer configuration"""
     id: str
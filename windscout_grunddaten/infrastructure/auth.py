@@ -4,10 +4,8 @@ Authentication management for WindScout Grunddaten Plugin
 This module handles authentication with API keys using QGIS Authentication System.
 """
 import os
-import json
 import logging
-import traceback
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 from qgis.core import (
     QgsSettings,
@@ -17,6 +15,23 @@ from qgis.core import (
 from qgis.PyQt.QtCore import QByteArray
 from qgis.PyQt.QtNetwork import QNetworkRequest
 
+from .. import jsonutil
+
+# Pre-configured credentials shipped next to the plugin modules
+_PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CREDENTIALS_FILE = os.path.join(_PLUGIN_DIR, 'credentials.json')
+
+# QgsAuthManager singleton, looked up on first use
+_auth_mgr = None
+
+
+def _get_auth_manager():
+    """Return the QGIS authentication manager, caching the singleton"""
+    global _auth_mgr
+    if _auth_mgr is None:
+        _auth_mgr = QgsApplication.authManager()
+    return _auth_mgr
+
 
 class AuthManager:
     """
@@ -35,24 +50,52 @@ class AuthManager:
         """
         self.logger = logger or logging.getLogger('qgis_plugin.auth')
         self.settings = QgsSettings()
+        # Memoized result of get_credentials, reset whenever credentials change
+        self._creds_cache = None
+        # Encoded (name, value) X-API-KEY header and the key it was built from
+        self._header_pair = None
+        self._header_pair_key = None
+        
+        # Earlier versions kept a plaintext copy of the key in the settings
+        if self.settings.contains("ogc_layer_handler/api_key_cache"):
+            self.settings.remove("ogc_layer_handler/api_key_cache")
+
+    def clear_credentials_cache(self) -> None:
+        """Forget all credentials held in memory, e.g. on logout"""
+        self._creds_cache = None
+        self._header_pair = None
+        self._header_pair_key = None
 
     def load_preconfigured_credentials(self) -> bool:
         """
         Load pre-configured API key credentials from the credentials file
         
+        The file is only parsed and stored again when it changed since it was
+        last imported or no credentials are configured.
+        
         Returns:
             bool: True if credentials were successfully loaded
         """
         try:
             # Find credentials file in plugin directory
-            credentials_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'credentials.json')
+            credentials_file = _CREDENTIALS_FILE
             self.logger.info(f"Looking for credentials file at: {credentials_file}")
             
-            if os.path.exists(credentials_file):
+            try:
+                file_mtime = os.stat(credentials_file).st_mtime
+            except OSError:
+                file_mtime = None
+                
+            if file_mtime is not None:
                 self.logger.info(f"Found credentials file at {credentials_file}")
                 
-                with open(credentials_file, 'r') as f:
-                    creds = json.load(f)
+                imported_mtime = self.settings.value("ogc_layer_handler/creds_file_mtime", 0.0, type=float)
+                if imported_mtime == file_mtime and self.has_credentials():
+                    self.logger.info("Credentials file unchanged since last import, keeping stored credentials")
+                    return True
+                
+                with open(credentials_file, 'rb') as f:
+                    creds = jsonutil.loads(f.read())
                     
                 if 'organization' in creds and 'api_key' in creds:
                     self.logger.info(f"Loaded pre-configured credentials for {creds['organization']}")
@@ -63,12 +106,15 @@ class AuthManager:
                         self.logger.info(f"Saved hostname from credentials: {creds['hostname']}")
                     
                     # Store the credentials using existing method
+                    self._creds_cache = None
                     result = self.save_credentials(
                         creds['organization'], 
                         creds['api_key'],
                         True
                     )
                     
+                    if result:
+                        self.settings.setValue("ogc_layer_handler/creds_file_mtime", file_mtime)
                     return result
                 else:
                     self.logger.warning("Credentials file is missing required fields (organization, api_key)")
@@ -78,8 +124,7 @@ class AuthManager:
             return False
             
         except Exception as e:
-            self.logger.error(f"Error loading pre-configured credentials: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f"Error loading pre-configured credentials: {str(e)}")
             return False
         
     def save_credentials(self, organization: str, api_key: str, save_key: bool = True) -> bool:
@@ -94,6 +139,10 @@ class AuthManager:
         Returns:
             bool: Success
         """
+        # Invalidate before any setting changes so a partial save is never served
+        self._creds_cache = None
+        self._header_pair = None
+        self._header_pair_key = None
         try:
             # Always save organization
             self.settings.setValue("ogc_layer_handler/auth_organization", organization)
@@ -119,8 +168,7 @@ class AuthManager:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error saving API key credentials: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f"Error saving API key credentials: {str(e)}")
             return False
             
     def create_api_key_auth_config(self, organization: str, api_key: str) -> Optional[str]:
@@ -148,7 +196,7 @@ class AuthManager:
             auth_config.setConfig("X-API-KEY", api_key)
             
             # Store the configuration in QGIS auth database
-            auth_manager = QgsApplication.authManager()
+            auth_manager = _get_auth_manager()
             if auth_manager.storeAuthenticationConfig(auth_config):
                 # Get the assigned ID after storing
                 auth_id = auth_config.id()
@@ -159,20 +207,25 @@ class AuthManager:
                 self.logger.error(f"Auth manager error: {auth_manager.lastAuthenticationError()}")
                 return None
         except Exception as e:
-            self.logger.error(f"Error creating API key auth configuration: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f"Error creating API key auth configuration: {str(e)}")
             return None
 
     def get_credentials(self) -> Tuple[str, str, bool, str]:
         """
         Get saved API key credentials
         
+        The result is memoized until the credentials are saved again, so the
+        settings and the auth database are not read on every request.
+        
         Returns:
             tuple: (organization, api_key, save_key, auth_config_id)
         """
+        if self._creds_cache is not None:
+            return self._creds_cache
+            
         try:
             organization = self.settings.value("ogc_layer_handler/auth_organization", "")
-            save_key = self.settings.value("ogc_layer_handler/auth_save_key", False)
+            save_key = self.settings.value("ogc_layer_handler/auth_save_key", False, type=bool)
             auth_config_id = self.settings.value("ogc_layer_handler/auth_config_id", "")
             
             # Get API key from auth configuration if available
@@ -180,13 +233,26 @@ class AuthManager:
             if auth_config_id:
                 api_key = self.get_api_key_from_auth_config(auth_config_id)
             
-            return (organization, api_key, save_key == "true" or save_key is True, auth_config_id)
+            credentials = (organization, api_key, save_key, auth_config_id)
+            
+            # Do not memoize a missing key (e.g. auth database still locked)
+            if api_key or not auth_config_id:
+                self._creds_cache = credentials
+            return credentials
             
         except Exception as e:
-            self.logger.error(f"Error retrieving credentials: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f"Error retrieving credentials: {str(e)}")
             return ("", "", False, "")
     
+    def _fetch_state(self) -> Tuple[str, str, bool, str]:
+        """
+        Get the credentials shared by the header, config id and presence checks
+        
+        Returns:
+            tuple: (organization, api_key, save_key, auth_config_id)
+        """
+        return self.get_credentials()
+    
     def get_api_key_from_auth_config(self, auth_config_id: str) -> str:
         """
         Get API key from auth configuration
@@ -199,18 +265,16 @@ class AuthManager:
         """
         try:
             # Get auth manager
-            auth_manager = QgsApplication.authManager()
+            auth_manager = _get_auth_manager()
             
             # Get auth configuration
             auth_config = QgsAuthMethodConfig()
             
             if auth_manager.loadAuthenticationConfig(auth_config_id, auth_config, True):
-                # Get the API key from the config
-                value = auth_config.config("value")
+                # Get the API key from the config (stored under the header name)
+                value = auth_config.config("X-API-KEY")
                 if value:
                     self.logger.debug(f"Successfully retrieved API key from auth config")
-                    # Cache the key for direct HTTP testing
-                    self.settings.setValue("ogc_layer_handler/api_key_cache", value)
                     return value
                 else:
                     self.logger.warning(f"No API key found in auth config")
@@ -220,8 +284,7 @@ class AuthManager:
                 self.logger.error(f"Auth manager error: {auth_manager.lastAuthenticationError()}")
                 return ""
         except Exception as e:
-            self.logger.error(f"Error getting API key from auth configuration: {str(e)}")
-            self.logger.error(traceback.format_exc())
+            self.logger.exception(f"Error getting API key from auth configuration: {str(e)}")
             return ""
     
     def has_credentials(self) -> bool:
@@ -231,8 +294,7 @@ class AuthManager:
         Returns:
             bool: True if credentials exist
         """
-        _, _, _, auth_config_id = self.get_credentials()
-        return bool(auth_config_id)
+        return bool(self._fetch_state()[3])
     
     def get_auth_config_id(self) -> str:
         """
@@ -241,8 +303,7 @@ class AuthManager:
         Returns:
             str: Authentication configuration ID or empty string
         """
-        _, _, _, auth_config_id = self.get_credentials()
-        return auth_config_id
+        return self._fetch_state()[3]
         
     def get_auth_header(self) -> Dict[str, str]:
         """
@@ -252,13 +313,7 @@ class AuthManager:
             Dict[str, str]: Header dictionary
         """
         try:
-            # Try to get API key from auth config
-            _, api_key, _, _ = self.get_credentials()
-            
-            # If that fails, try to get from direct cache (fallback)
-            if not api_key:
-                api_key = self.settings.value("ogc_layer_handler/api_key_cache", "")
-                
+            api_key = self._fetch_state()[1]
             if api_key:
                 return {"X-API-KEY": api_key}
             return {}
@@ -266,6 +321,24 @@ class AuthManager:
             self.logger.error(f"Error getting auth header: {str(e)}")
             return {}
             
+    def iter_raw_header_pairs(self) -> Iterator[Tuple[QByteArray, QByteArray]]:
+        """
+        Iterate over the encoded authentication headers for setRawHeader
+        
+        The encoded pair is built once and reused until the API key changes.
+        
+        Yields:
+            tuple: (header name, header value) as QByteArray
+        """
+        api_key = self._fetch_state()[1]
+        if not api_key:
+            return
+            
+        if self._header_pair is None or self._header_pair_key != api_key:
+            self._header_pair = (QByteArray(b"X-API-KEY"), QByteArray(str(api_key).encode()))
+            self._header_pair_key = api_key
+        yield self._header_pair
+            
     def apply_auth_to_request(self, request: QNetworkRequest) -> None:
         """
         Apply authentication to a network request
@@ -274,24 +347,17 @@ class AuthManager:
             request: QNetworkRequest object
         """
         try:
-            # Get authentication header
-            auth_header = self.get_auth_header()
-            
             # Apply headers
-            for header_name, header_value in auth_header.items():
-                request.setRawHeader(
-                    QByteArray(header_name.encode()),
-                    QByteArray(str(header_value).encode())
-                )
+            for header_name, header_value in self.iter_raw_header_pairs():
+                request.setRawHeader(header_name, header_value)
                 
-            # Get authentication configuration ID
-            auth_config_id = self.get_auth_config_id()
+            # Without an auth config there is nothing to look up in the auth database
+            auth_config_id = self._fetch_state()[3]
             if auth_config_id:
                 # Apply authentication configuration
-                auth_manager = QgsApplication.authManager()
+                auth_manager = _get_auth_manager()
                 auth_manager.updateNetworkRequest(request, auth_config_id)
                 self.logger.debug(f"Applied auth config ID {auth_config_id} to request")
                 
         except Exception as e:
-            self.logger.error(f"Error applying authentication to request: {str(e)}")
-            self.logger.error(traceback.format_exc()) 
\ No newline at end of file
+            self.logger.exception(f"Error applying authentication to request: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Persistent caching for WindScout Grunddaten Plugin
+
+This module provides a single-file SQLite store used instead of writing
+one file per cache key into a directory, and a small in-process memory
+tier that can sit in front of it.
+"""
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger('qgis_plugin.cache')
+
+# Prefix of every stored value; bump it when the pickled layout changes so
+# entries written by older versions are discarded instead of misread
+CACHE_FORMAT_HEADER = b'V1\n'
+
+
+class TTLCache:
+    """
+    Size-bounded in-memory cache whose entries expire after a fixed time
+
+    When the cache is full the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expire_at, value); insertion order doubles as LRU order
+        self._data = OrderedDict()
+
+    def __getitem__(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._data.move_to_end(key)
+            return entry[1]
+        self._data.pop(key, None)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a value from the cache.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Any: Cached value or default if missing or expired
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value cache with per-entry expiry
+
+    All entries live in one database file inside the cache directory, so a
+    lookup is a single indexed query instead of an exists/getmtime/open chain.
+    Values are pickled behind CACHE_FORMAT_HEADER; entries with another header
+    or that can no longer be unpickled are dropped.
+    """
+
+    # Directories already created by any instance in this session
+    _dirs_made = set()
+
+    def __init__(self, directory: str, size_limit: int = 256 << 20):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache database
+            size_limit: Approximate maximum size of all stored values in bytes
+        """
+        self.logger = logger
+        self.directory = directory
+        self.size_limit = size_limit
+        if directory not in DiskCache._dirs_made:
+            os.makedirs(directory, exist_ok=True)
+            DiskCache._dirs_made.add(directory)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, 'cache.sqlite'),
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, "
+            "expire_at REAL, "
+            "size INTEGER NOT NULL, "
+            "value BLOB NOT NULL)"
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a value from the cache.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Any: Cached value or default if missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expire_at, value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return default
+
+        expire_at, value = row
+        if expire_at is not None and expire_at < time.time():
+            self.delete(key)
+            return default
+
+        value = bytes(value)
+        if not value.startswith(CACHE_FORMAT_HEADER):
+            self.logger.debug(f"Discarding cache entry {key} with an outdated format")
+            self.delete(key)
+            return default
+
+        try:
+            return pickle.loads(value[len(CACHE_FORMAT_HEADER):])
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self.delete(key)
+            return default
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: Cache key
+            value: Picklable value
+            expire: Time-to-live in seconds (optional, never expires if omitted)
+        """
+        blob = CACHE_FORMAT_HEADER + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expire_at = time.time() + expire if expire else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expire_at, size, value) VALUES (?, ?, ?, ?)",
+                (key, expire_at, len(blob), sqlite3.Binary(blob))
+            )
+            self._cull()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a value from the cache.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _cull(self) -> None:
+        """Drop expired entries and the oldest entries once the size limit is exceeded."""
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if total <= self.size_limit:
+            return
+
+        self._conn.execute("DELETE FROM cache WHERE expire_at < ?", (time.time(),))
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        excess = total - self.size_limit
+        if excess <= 0:
+            return
+
+        # Free just enough space, starting with the least recently written entries
+        stale = []
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM cache ORDER BY rowid"):
+            stale.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM cache WHERE rowid = ?", stale)
@@ -6,11 +6,55 @@ combining QGIS settings, config files, and fallback values.
 """
 import os
 import json
+import time
 import logging
+import functools
+import threading
 from typing import Dict, Optional, Any
 
 from qgis.core import QgsSettings
 
+from .. import jsonutil
+
+
+# Hostnames served over plain HTTP on their configured port
+LOCAL_HOSTS = frozenset({'localhost', '127.0.0.1'})
+
+# Keys that can be overridden through QGIS settings (ogc_layer_handler/<key>)
+_SETTINGS_KEYS = frozenset({
+    'config_hostname',
+    'config_port',
+    'auth_organization',
+    'auto_load_styles',
+    'layer_filter',
+    'profiling_enabled',
+})
+
+
+@functools.lru_cache(maxsize=256)
+def _make_getter(key: str):
+    """
+    Build a function resolving a dotted configuration key in a nested dict.
+    
+    Args:
+        key: Configuration key using dot notation (e.g. "services.external")
+        
+    Returns:
+        Callable: Function taking the config dict and returning the value or None
+    """
+    parts = tuple(key.split('.'))
+    
+    def _get(cfg):
+        for part in parts:
+            if not isinstance(cfg, dict):
+                return None
+            cfg = cfg.get(part)
+            if cfg is None:
+                return None
+        return cfg
+        
+    return _get
+
 
 class ConfigManager:
     """
@@ -34,30 +78,84 @@ class ConfigManager:
         self.config_path = config_path
         self._config = None
         self._config_mtime = None
+        # The file is stat'ed at most once per check interval (seconds)
+        self._config_checked_at = 0.0
+        self._config_check_interval = 2.0
+        # Serializes stat and reload when several threads see a stale config
+        self._config_lock = threading.RLock()
+        # service_id -> service config with proxy_path/region/internal flags, rebuilt after each reload
+        self._service_index = None
+        # service_id -> {layer_id: final layer config}, built per service on demand
+        self._layer_index = {}
+        # key -> value resolved from the config file by get_value
+        self._value_cache = {}
+        # Keys get_value looks up in QGIS settings before the config file
+        self._settings_keys = set(_SETTINGS_KEYS)
+        # Resolved server address, see invalidate_network_config
+        self._hostname = None
+        self._port = None
+        self._base_url = None
         
     @property
     def config(self) -> Dict:
         """
         Get configuration with automatic reloading when file changes.
         
+        The modification time is checked at most once per check interval,
+        so repeated accesses within one operation do not hit the filesystem.
+        
         Returns:
             Dict: Configuration dictionary
         """
-        if not self.config_path or not os.path.exists(self.config_path):
+        if not self.config_path:
             return {}
             
-        try:
-            current_mtime = os.path.getmtime(self.config_path)
-            if self._config is None or self._config_mtime != current_mtime:
-                self.logger.info(f"Loading configuration from {self.config_path}")
-                with open(self.config_path, 'r') as f:
-                    self._config = json.load(f)
-                self._config_mtime = current_mtime
-        except (FileNotFoundError, json.JSONDecodeError, Exception) as e:
-            self.logger.error(f"Error loading config: {str(e)}")
-            self._config = {}
+        now = time.monotonic()
+        if self._config is not None and now - self._config_checked_at < self._config_check_interval:
+            return self._config
             
-        return self._config
+        with self._config_lock:
+            # Another thread may have refreshed the config while we waited
+            if self._config is not None and now - self._config_checked_at < self._config_check_interval:
+                return self._config
+            self._config_checked_at = now
+                
+            # One stat call covers both the existence and the modification time check
+            try:
+                current_mtime = os.stat(self.config_path).st_mtime
+            except OSError:
+                # Missing file; reloaded as soon as it appears
+                self._config = {}
+                self._config_mtime = None
+                self._reset_indexes()
+                return self._config
+                
+            try:
+                if self._config is None or self._config_mtime != current_mtime:
+                    self.logger.info(f"Loading configuration from {self.config_path}")
+                    with open(self.config_path, 'rb', buffering=65536) as f:
+                        self._config = jsonutil.loads(f.read())
+                    self._config_mtime = current_mtime
+                    self._reset_indexes()
+            except (FileNotFoundError, json.JSONDecodeError, Exception) as e:
+                self.logger.error(f"Error loading config: {str(e)}")
+                self._config = {}
+                self._reset_indexes()
+                
+            return self._config
+        
+    def _reset_indexes(self) -> None:
+        """Drop the lookup indexes so they are rebuilt from the reloaded configuration"""
+        self._service_index = None
+        self._layer_index = {}
+        self._value_cache = {}
+        self.invalidate_network_config()
+        
+    def invalidate_network_config(self) -> None:
+        """Forget the resolved hostname and port, e.g. after the server settings were edited"""
+        self._hostname = None
+        self._port = None
+        self._base_url = None
     
     def get_hostname(self) -> str:
         """
@@ -66,17 +164,23 @@ class ConfigManager:
         Returns:
             str: Hostname for server connection
         """
+        # Access config first so a pending reload resets the memoized value
+        config = self.config
+        if self._hostname is not None:
+            return self._hostname
+            
         # First try QGIS settings
         hostname = self.settings.value("ogc_layer_handler/config_hostname")
         
         # If not found, try config file
         if not hostname:
-            hostname = self.config.get('hostname')
+            hostname = config.get('hostname')
             
         # Final fallback
         if not hostname:
             hostname = 'localhost'
             
+        self._hostname = hostname
         return hostname
         
     def get_port(self) -> str:
@@ -86,23 +190,97 @@ class ConfigManager:
         Returns:
             str: Port for server connection
         """
+        config = self.config
+        if self._port is not None:
+            return self._port
+            
         # First try QGIS settings
         port = self.settings.value("ogc_layer_handler/config_port")
         
         # If not found, try config file
         if not port:
-            port = self.config.get('port')
+            port = config.get('port')
             
         # Determine appropriate default based on hostname
         if not port:
             hostname = self.get_hostname()
-            if hostname in ['localhost', '127.0.0.1']:
+            if hostname in LOCAL_HOSTS:
                 port = '80'
             else:
                 port = '443'
             
-        return str(port)
+        self._port = str(port)
+        return self._port
+        
+    def get_base_url(self) -> str:
+        """
+        Get the base URL of the server, including protocol and port.
+        
+        Local hosts are served over HTTP on the configured port, all other
+        hosts over HTTPS on the standard port.
+        
+        Returns:
+            str: Base URL
+        """
+        # Access config first so a pending reload resets the memoized value
+        self.config
+        if self._base_url is not None:
+            return self._base_url
+            
+        hostname = self.get_hostname()
+        if hostname in LOCAL_HOSTS:
+            base_url = f"http://{hostname}:{self.get_port()}"
+        else:
+            base_url = f"https://{hostname}:443"  # Use standard HTTPS port for non-localhost
+            
+        self._base_url = base_url
+        return base_url
     
+    def _get_service_index(self) -> Dict:
+        """
+        Get the service lookup index, building it after a configuration reload.
+        
+        Each entry is a copy of the service augmented with its region and
+        either the proxy path or the internal service flags. External
+        services take precedence over internal ones and the first occurrence
+        of an ID wins, matching a scan in configuration order.
+        
+        Returns:
+            Dict: Mapping of service ID to augmented service configuration
+        """
+        # Access config first so a pending reload resets the index
+        services = self.config.get('services', {})
+        if self._service_index is not None:
+            return self._service_index
+            
+        index = {}
+        for group, is_internal in (('external_services', False), ('internal_services', True)):
+            for state_code, state_services in services.get(group, {}).items():
+                state_lower = state_code.lower()
+                for service in state_services:
+                    service_id = service.get('id')
+                    if service_id in index:
+                        continue
+                        
+                    service_config = service.copy()  # Create a copy to not modify original
+                    if is_internal:
+                        # Mark as internal tinyows service
+                        service_config['is_internal'] = True
+                        service_config['service_type'] = service_config.get('service_type', 'tinyows')
+                    elif service_config.get('type') == 'xyz_tiles':
+                        # Handle XYZ tiles specifically
+                        service_config['proxy_path'] = f"/xyz/{state_lower}/{service_id}"
+                    else:
+                        # Standard proxy path for WFS/WMS services
+                        service_config['proxy_path'] = f"/ogc/{state_lower}/{service_id}"
+                        
+                    # Store the region information
+                    service_config['region'] = state_code
+                    index[service_id] = service_config
+                    
+        self._service_index = index
+        return index
+        
     def get_service_config(self, service_id: str) -> Optional[Dict]:
         """
         Get configuration for a specific service.
@@ -111,48 +289,73 @@ class ConfigManager:
             service_id: Service ID to lookup
             
         Returns:
-            Dict: Service configuration or None if not found
+            Dict: Service configuration (read-only) or None if not found
         """
         if not self.config or 'services' not in self.config:
             self.logger.warning(f"No services found in configuration")
             return None
             
-        services = self.config.get('services', {})
-        
-        # Check external services across all federal states
-        external_services = services.get('external_services', {})
-        for state_code, state_services in external_services.items():
-            for service in state_services:
-                if service.get('id') == service_id:
-                    # Add auto-generated proxy_path
-                    service_config = service.copy()  # Create a copy to not modify original
-                    # Handle XYZ tiles specifically
-                    if service_config.get('type') == 'xyz_tiles':
-                        service_config['proxy_path'] = f"/xyz/{state_code.lower()}/{service_id}"
-                    else:
-                        # Standard proxy path for WFS/WMS services
-                        service_config['proxy_path'] = f"/ogc/{state_code.lower()}/{service_id}"
-                    
-                    # Store the region information
-                    service_config['region'] = state_code
-                    return service_config
-        
-        # Check internal services - for tinyows
-        internal_services = services.get('internal_services', {})
-        for state_code, state_services in internal_services.items():
-            for service in state_services:
-                if service.get('id') == service_id:
-                    # Mark as internal tinyows service
-                    service_config = service.copy()  # Create a copy to not modify original
-                    service_config['is_internal'] = True
-                    service_config['service_type'] = service_config.get('service_type', 'tinyows')
-                    # Store the region information
-                    service_config['region'] = state_code
-                    return service_config
+        service_config = self._get_service_index().get(service_id)
+        if service_config is not None:
+            # Shared with the index; callers must treat it as read-only
+            return service_config
         
         self.logger.warning(f"Service ID {service_id} not found in configuration")
         return None
         
+    def _get_layer_index(self, service_id: str, service_config: Dict) -> Dict:
+        """
+        Get the final layer configurations of a service, keyed by layer ID.
+        
+        Layers take precedence over collections, and the first occurrence
+        of an ID wins, matching a scan in configuration order. XYZ layers
+        get their default zoom levels and TinyOWS collections are converted
+        to the layer config format, once per configuration load.
+        
+        Args:
+            service_id: Service ID
+            service_config: Service configuration dictionary
+            
+        Returns:
+            Dict: Mapping of layer ID to layer configuration
+        """
+        layers_by_id = self._layer_index.get(service_id)
+        if layers_by_id is not None:
+            return layers_by_id
+            
+        layers_by_id = {}
+        is_xyz = service_config.get('type') == 'xyz_tiles'
+        for layer in service_config.get('layers', []):
+            layer_id = layer.get('id')
+            if layer_id in layers_by_id:
+                continue
+            if is_xyz:
+                # Create a complete layer config with XYZ-specific properties
+                layer = layer.copy()
+                
+                # Ensure min_zoom and max_zoom are present
+                layer.setdefault('min_zoom', 0)
+                layer.setdefault('max_zoom', 19)
+            layers_by_id[layer_id] = layer
+            
+        # For internal services (TinyOWS)
+        if service_config.get('is_internal', False):
+            region = service_config.get('region', '').lower()
+            for collection in service_config.get('collections', []):
+                collection_id = collection.get('id')
+                if collection_id in layers_by_id:
+                    continue
+                # Convert collection config to layer config format
+                layers_by_id[collection_id] = {
+                    'id': collection_id,
+                    'name': collection.get('name', collection_id),
+                    'type_name': f"{region}_{collection_id}",  # TinyOWS naming format
+                    'description': collection.get('description', '')
+                }
+                
+        self._layer_index[service_id] = layers_by_id
+        return layers_by_id
+        
     def get_layer_config(self, service_id: str, layer_id: str) -> Optional[Dict]:
         """
         Get configuration for a specific layer.
@@ -162,45 +365,15 @@ class ConfigManager:
             layer_id: Layer ID
             
         Returns:
-            Dict: Layer configuration or None if not found
+            Dict: Layer configuration (read-only) or None if not found
         """
         service_config = self.get_service_config(service_id)
         if not service_config:
             return None
             
-        # For external services
-        if 'layers' in service_config:
-            for layer in service_config['layers']:
-                if layer.get('id') == layer_id:
-                    # For XYZ Tiles, add specific handling
-                    if service_config.get('type') == 'xyz_tiles':
-                        # Create a complete layer config with XYZ-specific properties
-                        layer_config = layer.copy()
-                        
-                        # Ensure min_zoom and max_zoom are present
-                        if 'min_zoom' not in layer_config:
-                            layer_config['min_zoom'] = 0
-                        if 'max_zoom' not in layer_config:
-                            layer_config['max_zoom'] = 19
-                            
-                        return layer_config
-                    else:
-                        # Regular layer handling for WFS/WMS
-                        return layer
-                    
-        # For internal services (TinyOWS)
-        if service_config.get('is_internal', False) and 'collections' in service_config:
-            for collection in service_config['collections']:
-                # Check against the collection's id field
-                if collection.get('id') == layer_id:
-                    # Convert collection config to layer config format
-                    layer_config = {
-                        'id': collection.get('id'),
-                        'name': collection.get('name', collection.get('id')),
-                        'type_name': f"{service_config.get('region', '').lower()}_{collection.get('id')}",  # TinyOWS naming format
-                        'description': collection.get('description', '')
-                    }
-                    return layer_config
+        layer_config = self._get_layer_index(service_id, service_config).get(layer_id)
+        if layer_config is not None:
+            return layer_config
                 
         self.logger.warning(f"Layer ID {layer_id} not found in service {service_id}")
         return None
@@ -231,10 +404,25 @@ class ConfigManager:
                     
         return None
         
+    def get_metadata_parallelism(self) -> int:
+        """
+        Get the maximum number of concurrent metadata requests.
+        
+        Returns:
+            int: Number of requests in flight at once (at least 1)
+        """
+        try:
+            return max(1, int(self.get_value('metadata_parallelism', 8)))
+        except (TypeError, ValueError):
+            return 8
+        
     def get_value(self, key: str, default: Any = None) -> Any:
         """
         Get a configuration value with fallback strategy.
         
+        QGIS settings are only consulted for user-editable keys; all other
+        keys are read from the config file directly.
+        
         Args:
             key: Configuration key
             default: Default value if not found
@@ -242,24 +430,20 @@ class ConfigManager:
         Returns:
             Any: Configuration value
         """
-        # First try QGIS settings
-        value = self.settings.value(f"ogc_layer_handler/{key}")
+        # First try QGIS settings, for the keys users can edit there
+        value = None
+        if key in self._settings_keys:
+            value = self.settings.value(f"ogc_layer_handler/{key}")
         
-        # If not found, try config file
+        # If not found, try config file (settings may change at any time and are not cached)
         if value is None:
-            # Handle nested keys using dot notation (e.g. "services.external")
-            if '.' in key:
-                parts = key.split('.')
-                cfg = self.config
-                for part in parts:
-                    if isinstance(cfg, dict) and part in cfg:
-                        cfg = cfg[part]
-                    else:
-                        cfg = None
-                        break
-                value = cfg
+            config = self.config  # may reload and clear the value cache
+            if key in self._value_cache:
+                value = self._value_cache[key]
             else:
-                value = self.config.get(key)
+                # Handle nested keys using dot notation (e.g. "services.external")
+                value = _make_getter(key)(config)
+                self._value_cache[key] = value
             
         # Final fallback
         if value is None:
@@ -3,17 +3,24 @@ Network client for WindScout Grunddaten Plugin
 
 This module provides a central place for making HTTP requests.
 """
-import json
 import logging
-from typing import Dict, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple
 
-from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtCore import QUrl, QUrlQuery, QByteArray, QEventLoop, QTimer
 from qgis.PyQt.QtNetwork import QNetworkRequest
 from qgis.core import QgsNetworkAccessManager, QgsNetworkReplyContent
 
+from .. import jsonutil
 from .auth import AuthManager
+from .cache import TTLCache
 from .config import ConfigManager
 
+# Named HTTP2AllowedAttribute before Qt 5.15
+_HTTP2_ALLOWED_ATTRIBUTE = getattr(
+    QNetworkRequest, 'Http2AllowedAttribute',
+    getattr(QNetworkRequest, 'HTTP2AllowedAttribute', None)
+)
+
 
 class NetworkClient:
     """
@@ -23,6 +30,11 @@ class NetworkClient:
     reducing code duplication throughout the plugin.
     """
     
+    __slots__ = ('logger', 'config_manager', 'auth_manager', 'network_manager', '_request_template')
+    
+    # Upper bound for waiting on a batch of requests, in milliseconds
+    request_timeout = 60000
+    
     def __init__(self, config_manager: ConfigManager, auth_manager: AuthManager):
         """
         Initialize the network client.
@@ -36,6 +48,17 @@ class NetworkClient:
         self.auth_manager = auth_manager
         self.network_manager = QgsNetworkAccessManager.instance()
         
+        # Attributes shared by all requests; allow HTTP/2 so repeated calls to the
+        # same host share one connection, and follow redirects inside Qt without
+        # a new round trip
+        self._request_template = QNetworkRequest()
+        if _HTTP2_ALLOWED_ATTRIBUTE is not None:
+            self._request_template.setAttribute(_HTTP2_ALLOWED_ATTRIBUTE, True)
+        self._request_template.setAttribute(
+            QNetworkRequest.RedirectPolicyAttribute,
+            QNetworkRequest.NoLessSafeRedirectPolicy
+        )
+        
     def get_base_url(self) -> str:
         """
         Get the base URL for API requests.
@@ -43,51 +66,149 @@ class NetworkClient:
         Returns:
             str: Base URL
         """
-        hostname = self.config_manager.get_hostname()
-        port = self.config_manager.get_port()
-        
-        # Determine protocol based on hostname
-        if hostname in ['localhost', '127.0.0.1']:
-            protocol = 'http'
-        else:
-            protocol = 'https'
-            port = '443'  # Use standard HTTPS port for non-localhost
-            
-        return f"{protocol}://{hostname}:{port}"
+        return self.config_manager.get_base_url()
     
-    def request(self, path: str, params: Dict = None) -> Tuple[bool, Dict, int]:
+    def request(self, path: str, params: Dict = None, headers: Dict = None) -> Tuple[bool, Dict, int]:
         """
         Make a GET request to the API.
         
         Args:
             path: API path
             params: Query parameters (optional)
+            headers: Extra request headers (optional)
             
         Returns:
             Tuple[bool, dict, int]: (success, response data, status code)
         """
+        return self.request_many([(path, params, headers)])[0]
+        
+    def request_async(self, path: str, params: Dict = None, headers: Dict = None):
+        """
+        Start a GET request to the API without waiting for it.
+        
+        Args:
+            path: API path
+            params: Query parameters (optional)
+            headers: Extra request headers (optional)
+            
+        Returns:
+            QNetworkReply: Reply emitting finished once the response arrived
+        """
         base_url = self.get_base_url()
-        url = f"{base_url}{path}"
+        url = QUrl(f"{base_url}{path}")
         
-        # Add query parameters if provided
+        # Add query parameters if provided; QUrlQuery percent-encodes delimiters
         if params:
-            query_items = []
+            query = QUrlQuery()
             for key, value in params.items():
-                query_items.append(f"{key}={value}")
-            url = f"{url}?{'&'.join(query_items)}"
+                query.addQueryItem(str(key), str(value))
+            url.setQuery(query)
             
-        self.logger.debug(f"Making GET request to: {url}")
+        # Skip formatting the URL unless debug logging is on
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Making GET request to: {url.toString()}")
+        
+        # Create request from the template, which already carries the static attributes
+        request = QNetworkRequest(self._request_template)
+        request.setUrl(url)
         
-        # Create request
-        request = QNetworkRequest(QUrl(url))
+        # Qt advertises gzip/deflate itself and only decompresses transparently
+        # when the Accept-Encoding header was not set by the caller
+        if headers:
+            for header_name, header_value in headers.items():
+                request.setRawHeader(
+                    QByteArray(header_name.encode()),
+                    QByteArray(str(header_value).encode())
+                )
         
-        # Apply authentication
+        # Apply authentication per request, so changed credentials take effect immediately
         self.auth_manager.apply_auth_to_request(request)
         
-        # Make blocking request
-        reply = self.network_manager.blockingGet(request)
+        # QgsNetworkAccessManager.instance() is per thread; layers are also
+        # created from worker threads, which must not use the main thread's manager
+        return QgsNetworkAccessManager.instance().get(request)
+        
+    def request_many(self, requests: List[Tuple], with_headers: bool = False,
+                     max_in_flight: Optional[int] = None) -> List[Tuple]:
+        """
+        Make several GET requests to the API concurrently.
+        
+        Up to max_in_flight requests run at once; each finished reply starts
+        the next queued request. The call returns when every reply has
+        finished, so the wall time is about ceil(N / max_in_flight) round
+        trips instead of N.
+        
+        Args:
+            requests: List of (path, params) or (path, params, headers) tuples
+            with_headers: Also return the response headers of each reply
+            max_in_flight: Maximum number of concurrent requests (optional, all at once if omitted)
+            
+        Returns:
+            List[Tuple]: (success, response data, status code) per request, in order,
+                extended by a dict of lower-cased response headers if with_headers is set
+        """
+        if not requests:
+            return []
+            
+        loop = QEventLoop()
+        remaining = [len(requests)]
+        replies = [None] * len(requests)
+        next_index = [0]
+        waiting = [True]
+        
+        def start_next():
+            index = next_index[0]
+            next_index[0] += 1
+            path, params, *headers = requests[index]
+            reply = self.request_async(path, params, headers[0] if headers else None)
+            reply.finished.connect(on_finished)
+            replies[index] = reply
+            
+        def on_finished():
+            remaining[0] -= 1
+            # Aborting timed-out replies below also emits finished
+            if waiting[0] and next_index[0] < len(requests):
+                start_next()
+            if remaining[0] == 0:
+                loop.quit()
+                
+        for _ in range(min(max_in_flight or len(requests), len(requests))):
+            start_next()
+            
+        # Wait for all replies or the timeout, whichever comes first
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        timer.start(self.request_timeout)
+        if remaining[0] > 0:
+            loop.exec_()
+        timer.stop()
+        waiting[0] = False
         
-        return self._process_reply(reply)
+        results = []
+        for reply in replies:
+            if reply is None:
+                # Still queued when the timeout hit
+                result = (False, {"error": "Request not started before timeout"}, None)
+                results.append(result + ({},) if with_headers else result)
+                continue
+                
+            if not reply.isFinished():
+                self.logger.warning(f"Request timed out: {reply.url().toString()}")
+                reply.abort()
+                
+            reply_content = QgsNetworkReplyContent(reply)
+            reply_content.setContent(reply.readAll())
+            result = self._process_reply(reply_content)
+            if with_headers:
+                result += ({
+                    bytes(name).decode('latin-1').lower(): bytes(value).decode('latin-1')
+                    for name, value in reply_content.rawHeaderPairs()
+                },)
+            results.append(result)
+            reply.deleteLater()
+            
+        return results
     
     def _process_reply(self, reply: QgsNetworkReplyContent) -> Tuple[bool, Dict, int]:
         """
@@ -102,35 +223,37 @@ class NetworkClient:
         # Get status code
         status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
         
+        # Get response content once; it is only decoded to text when needed
+        raw = bytes(reply.content())
+        
         # Check if request was successful
         if reply.error() == 0:  # QNetworkReply.NoError
             try:
-                # Get response content
-                content = bytes(reply.content()).decode('utf-8')
-                
-                # Try to parse as JSON
-                try:
-                    data = json.loads(content)
-                    return True, data, status_code
-                except json.JSONDecodeError:
-                    # Return as plain text
-                    return True, {"content": content}, status_code
+                # XML (e.g. OGC capabilities) is returned as text without a JSON attempt
+                if b'xml' not in bytes(reply.rawHeader(b'Content-Type')).lower():
+                    # Try to parse as JSON straight from the bytes
+                    try:
+                        data = jsonutil.loads(raw)
+                        return True, data, status_code
+                    except ValueError:
+                        pass
+                        
+                # Return as plain text
+                return True, {"content": raw.decode('utf-8')}, status_code
                     
             except Exception as e:
                 self.logger.error(f"Error processing response: {str(e)}")
                 return False, {"error": str(e)}, status_code
         else:
             error_msg = reply.errorString()
-            self.logger.error(f"Request failed: {error_msg}")
-            self.logger.error(f"HTTP status code: {status_code}")
+            self.logger.error(f"Request failed: {error_msg} (HTTP status code: {status_code})")
             
-            # Try to get error response content
-            try:
-                error_content = bytes(reply.content()).decode('utf-8')
-                self.logger.error(f"Error response: {error_content}")
-                return False, {"error": error_msg, "content": error_content}, status_code
-            except:
+            # Error bodies are informational only, so undecodable bytes are replaced
+            if not raw:
                 return False, {"error": error_msg}, status_code
+            error_content = raw.decode('utf-8', errors='replace')
+            self.logger.error(f"Error response: {error_content}")
+            return False, {"error": error_msg, "content": error_content}, status_code
 
 
 class MetadataClient:
@@ -140,6 +263,8 @@ class MetadataClient:
     This class handles the specific API calls for metadata retrieval.
     """
     
+    __slots__ = ('logger', 'network_client', '_cache', '_etag_cache')
+    
     def __init__(self, network_client: NetworkClient):
         """
         Initialize the metadata client.
@@ -149,6 +274,17 @@ class MetadataClient:
         """
         self.logger = logging.getLogger('qgis_plugin.metadata_client')
         self.network_client = network_client
+        # (base_url, auth_config_id, proxy_path, collection_id) -> metadata of successful fetches;
+        # the credentials are part of the key so metadata is never shared across logins
+        self._cache = TTLCache(maxsize=512, ttl=900)
+        # (base_url, auth_config_id, path, params) -> (etag, last_modified) validators
+        # of the last full response, scoped like _cache
+        self._etag_cache = TTLCache(maxsize=512, ttl=3600)
+        
+    def invalidate_cache(self) -> None:
+        """Forget all fetched metadata, e.g. after the configuration changed"""
+        self._cache.clear()
+        self._etag_cache.clear()
         
     def fetch_metadata(self, service_config: Dict, collection_id: str) -> Optional[Dict]:
         """
@@ -161,47 +297,134 @@ class MetadataClient:
         Returns:
             Dict: Metadata or None if request failed
         """
-        # Different handling based on service type
-        if service_config.get('is_internal', False):
-            return self.fetch_tinyows_metadata(collection_id)
-        else:
-            return self.fetch_external_metadata(service_config, collection_id)
-    
-    def fetch_tinyows_metadata(self, collection_id: str) -> Optional[Dict]:
+        return self.fetch_metadata_many([(service_config, collection_id)])[0]
+        
+    def fetch_metadata_many(self, items: List[Tuple[Dict, str]]) -> List[Optional[Dict]]:
         """
-        Fetch metadata for TinyOWS layers.
+        Fetch metadata for several collections with one concurrent batch of requests.
         
         Args:
-            collection_id: Collection ID
+            items: List of (service_config, collection_id) tuples
             
         Returns:
-            Dict: Metadata or None if request failed
+            List[Optional[Dict]]: Metadata or None per item, in order
         """
-        try:
-            # Capabilities URL for specific layer
-            params = {
-                "service": "WFS",
-                "version": "1.1.0",
-                "request": "DescribeFeatureType",
-                "typename": collection_id
-            }
-            
-            success, data, status_code = self.network_client.request("/tinyows", params)
-            
-            if success:
-                # TinyOWS returns XML schema, but we can extract basic info
-                return {
-                    'id': collection_id,
-                    'title': f"TinyOWS Layer: {collection_id}",
-                    'description': f"WFS layer from TinyOWS service"
-                }
+        results = [None] * len(items)
+        pending = []
+        for index, (service_config, collection_id) in enumerate(items):
+            # TinyOWS metadata needs no request
+            if service_config.get('is_internal', False):
+                results[index] = self.fetch_tinyows_metadata(collection_id)
+                continue
+                
+            # Metadata configured statically needs no request either
+            mapped = self._mapped_metadata(service_config, collection_id)
+            if mapped is not None:
+                results[index] = mapped
+                continue
+                
+            cache_key = self._cache_key(service_config, collection_id)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                results[index] = dict(cached)
             else:
-                self.logger.warning(f"Failed to fetch metadata for collection {collection_id}")
-                return None
+                pending.append((index, cache_key))
                 
+        if not pending:
+            return results
+            
+        try:
+            requests = [self._external_request(items[index][0]) for index, _ in pending]
+            responses = self._request_conditional(requests)
         except Exception as e:
-            self.logger.error(f"Error fetching TinyOWS metadata: {str(e)}")
-            return None
+            self.logger.error(f"Error fetching metadata: {str(e)}")
+            return results
+            
+        for (index, cache_key), (success, data, status_code) in zip(pending, responses):
+            service_config, collection_id = items[index]
+            metadata = self._external_result(service_config, collection_id, success)
+            if metadata is not None:
+                self._cache[cache_key] = metadata
+                results[index] = dict(metadata)
+        return results
+    
+    def _cache_key(self, service_config: Dict, collection_id: str) -> Tuple[str, str, str, str]:
+        """
+        Build the metadata cache key of a collection.
+        
+        Args:
+            service_config: Service configuration
+            collection_id: Collection ID
+            
+        Returns:
+            Tuple[str, str, str, str]: (base_url, auth_config_id, proxy_path, collection_id)
+        """
+        return (
+            self.network_client.get_base_url(),
+            self.network_client.auth_manager.get_auth_config_id(),
+            service_config.get('proxy_path', ''),
+            collection_id
+        )
+        
+    def _request_conditional(self, requests: List[Tuple[str, Dict]]) -> List[Tuple[bool, Dict, int]]:
+        """
+        Make requests as conditional GETs using the validators of earlier responses.
+        
+        A 304 Not Modified reply counts as success; the metadata built from a
+        reply only depends on whether the request succeeded.
+        
+        Args:
+            requests: List of (path, params) tuples
+            
+        Returns:
+            List[Tuple[bool, dict, int]]: (success, response data, status code) per request, in order
+        """
+        base_url = self.network_client.get_base_url()
+        auth_config_id = self.network_client.auth_manager.get_auth_config_id()
+        keys = []
+        conditional = []
+        for path, params in requests:
+            key = (base_url, auth_config_id, path, tuple(sorted(params.items())) if params else ())
+            headers = {}
+            etag, last_modified = self._etag_cache.get(key, (None, None))
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            keys.append(key)
+            conditional.append((path, params, headers))
+            
+        responses = self.network_client.request_many(
+            conditional,
+            with_headers=True,
+            max_in_flight=self.network_client.config_manager.get_metadata_parallelism()
+        )
+        
+        results = []
+        for key, (success, data, status_code, headers) in zip(keys, responses):
+            if status_code == 200 and ('etag' in headers or 'last-modified' in headers):
+                self._etag_cache[key] = (headers.get('etag'), headers.get('last-modified'))
+            results.append((success, data, status_code))
+        return results
+        
+    def fetch_tinyows_metadata(self, collection_id: str) -> Optional[Dict]:
+        """
+        Get metadata for TinyOWS layers.
+        
+        The metadata only depends on the collection ID, so no request to
+        the TinyOWS service is made.
+        
+        Args:
+            collection_id: Collection ID
+            
+        Returns:
+            Dict: Metadata
+        """
+        return {
+            'id': collection_id,
+            'title': f"TinyOWS Layer: {collection_id}",
+            'description': f"WFS layer from TinyOWS service"
+        }
             
     def fetch_external_metadata(self, service_config: Dict, collection_id: str) -> Optional[Dict]:
         """
@@ -214,38 +437,94 @@ class MetadataClient:
         Returns:
             Dict: Metadata or None if request failed
         """
+        mapped = self._mapped_metadata(service_config, collection_id)
+        if mapped is not None:
+            return mapped
+            
+        cache_key = self._cache_key(service_config, collection_id)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+            
         try:
-            proxy_path = service_config.get('proxy_path', '')
-            
-            # Construct WFS GetCapabilities request through proxy
-            params = {
-                "service": "WFS",
-                "version": "2.0.0",
-                "request": "GetCapabilities"
-            }
-            
-            success, data, status_code = self.network_client.request(proxy_path, params)
-            
-            if success:
-                # Extract metadata from service_config if available (new feature)
-                metadata_mapping = service_config.get('metadata_mapping', {})
-                if metadata_mapping:
-                    self.logger.info(f"Using metadata mapping from config.json for {collection_id}")
-                    return {
-                        'id': collection_id,
-                        'title': metadata_mapping.get('title', f"External Layer: {collection_id}"),
-                        'description': metadata_mapping.get('description', f"Layer from external WFS service"),
-                        'license': metadata_mapping.get('license', None),
-                        'attribution': metadata_mapping.get('author', None),
-                        'updated': metadata_mapping.get('updated', None),
-                        'data_uri': metadata_mapping.get('data_uri', None)
-                    }
-                # Default metadata if mapping not available
-                return {
-                    'id': collection_id,
-                    'title': f"External Layer: {collection_id}",
-                    'description': f"Metadata for layer {collection_id} from external WFS service"
-                }
+            success, data, status_code = self._request_conditional([self._external_request(service_config)])[0]
+            metadata = self._external_result(service_config, collection_id, success)
+            if metadata is not None:
+                self._cache[cache_key] = metadata
+                return dict(metadata)
         except Exception as e:
            self.logger.error(f"Error fetching external metadata: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+        
+    def _mapped_metadata(self, service_config: Dict, collection_id: str) -> Optional[Dict]:
+        """
+        Build external layer metadata from the metadata mapping in config.json.
+        
+        The mapped metadata does not use the service response, so no request
+        is needed when a mapping is configured.
+        
+        Args:
+            service_config: Service configuration
+            collection_id: Collection ID
+            
+        Returns:
+            Dict: Metadata or None if no mapping is configured
+        """
+        metadata_mapping = service_config.get('metadata_mapping', {})
+        if not metadata_mapping:
+            return None
+            
+        self.logger.info(f"Using metadata mapping from config.json for {collection_id}")
+        return {
+            'id': collection_id,
+            'title': metadata_mapping.get('title', f"External Layer: {collection_id}"),
+            'description': metadata_mapping.get('description', f"Layer from external WFS service"),
+            'license': metadata_mapping.get('license', None),
+            'attribution': metadata_mapping.get('author', None),
+            'updated': metadata_mapping.get('updated', None),
+            'data_uri': metadata_mapping.get('data_uri', None)
+        }
+        
+    def _external_request(self, service_config: Dict) -> Tuple[str, Dict]:
+        """
+        Build the GetCapabilities request for an external WFS service.
+        
+        Args:
+            service_config: Service configuration
+            
+        Returns:
+            Tuple[str, Dict]: (path, query parameters)
+        """
+        proxy_path = service_config.get('proxy_path', '')
+        
+        # Construct WFS GetCapabilities request through proxy; only the
+        # outcome is used, so ask for the small ServiceIdentification section
+        params = {
+            "service": "WFS",
+            "version": "2.0.0",
+            "request": "GetCapabilities",
+            "sections": "ServiceIdentification"
+        }
+        return proxy_path, params
+        
+    def _external_result(self, service_config: Dict, collection_id: str, success: bool) -> Optional[Dict]:
+        """
+        Build external layer metadata from the outcome of its request.
+        
+        Args:
+            service_config: Service configuration
+            collection_id: Collection ID
+            success: Whether the request succeeded
+            
+        Returns:
+            Dict: Metadata or None if request failed
+        """
+        if not success:
+            return None
+            
+        # Default metadata if mapping not available
+        return {
+            'id': collection_id,
+            'title': f"External Layer: {collection_id}",
+            'description': f"Metadata for layer {collection_id} from external WFS service"
+        }
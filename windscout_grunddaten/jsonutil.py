@@ -0,0 +1,57 @@
+"""
+JSON helpers for WindScout Grunddaten Plugin
+
+Uses orjson when it is installed in the QGIS Python environment and
+falls back to the standard library json module otherwise.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """
+    Parse a JSON document.
+
+    Args:
+        data: JSON document as str, bytes or bytearray
+
+    Returns:
+        Any: Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(obj) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        bytes: JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+
+def dumps(obj) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        str: JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj)
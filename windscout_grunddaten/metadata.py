@@ -1,57 +1,52 @@
 from qgis.core import QgsLayerMetadata, QgsBox3d, QgsDateTimeRange, QgsProject, QgsMapLayer
 import os
-import json
+import sys
 import logging
-from typing import Dict, Optional
+import functools
 import time
+from typing import Dict, Optional
+
+from . import jsonutil
+from .infrastructure.cache import DiskCache, TTLCache
+from .domain.metadata import set_custom_properties
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=8)
+def _load_config(config_path: str, config_mtime: float) -> dict:
+    """Load a configuration file; keyed on mtime so stale versions evict naturally"""
+    with open(config_path, 'rb') as f:
+        return jsonutil.loads(f.read())
 
 class MetadataCache:
     """Cache for layer metadata to avoid repeated loading"""
     
     def __init__(self, cache_dir: str = None):
         self.cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.qgis_metadata_cache')
-        os.makedirs(self.cache_dir, exist_ok=True)
-        self.memory_cache = {}
-        self.cache_times = {}
-        self.logger = logging.getLogger(__name__)
+        self._mem = TTLCache(maxsize=512, ttl=300)  # 5 minute TTL
+        self._dc = DiskCache(self.cache_dir, size_limit=256 << 20)
+        self.logger = logger
         
     def get(self, key: str) -> Optional[Dict]:
         """Get metadata from cache"""
         # Check memory cache first
-        if key in self.memory_cache:
-            if time.time() - self.cache_times[key] < 300:  # 5 minute TTL
-                return self.memory_cache[key]
-            else:
-                del self.memory_cache[key]
-                del self.cache_times[key]
-                
-        # Check disk cache
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
-        if os.path.exists(cache_file):
-            if time.time() - os.path.getmtime(cache_file) < 3600:  # 1 hour TTL
-                try:
-                    with open(cache_file, 'r') as f:
-                        metadata = json.load(f)
-                    self.memory_cache[key] = metadata
-                    self.cache_times[key] = time.time()
-                    return metadata
-                except:
-                    self.logger.warning(f"Failed to read metadata cache for {key}")
-                    
-        return None
+        try:
+            return self._mem[key]
+        except KeyError:
+            pass
+            
+        # Fall back to a single lookup in the disk cache
+        metadata = self._dc.get(key)
+        if metadata is not None:
+            self._mem[key] = metadata
+        return metadata
         
     def set(self, key: str, metadata: Dict):
         """Store metadata in cache"""
-        # Store in memory
-        self.memory_cache[key] = metadata
-        self.cache_times[key] = time.time()
-        
-        # Store on disk
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
+        self._mem[key] = metadata
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(metadata, f)
-        except:
+            self._dc.set(key, metadata, expire=3600)  # 1 hour TTL
+        except Exception:
             self.logger.warning(f"Failed to write metadata cache for {key}")
 
 class MetadataHandler:
@@ -60,9 +55,10 @@ class MetadataHandler:
     def __init__(self, config_path: str = None):
         self.config_path = config_path
         self._config = None
-        self._config_mtime = None
+        self._config_checked_at = 0.0
+        self._config_check_interval = 2.0  # seconds between mtime checks
         self.cache = MetadataCache()
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.credential_manager = None
         
     @property
@@ -71,11 +67,12 @@ class MetadataHandler:
         if not self.config_path:
             return {}
             
-        config_mtime = os.path.getmtime(self.config_path)
-        if not self._config or self._config_mtime != config_mtime:
-            with open(self.config_path, 'r') as f:
-                self._config = json.load(f)
-            self._config_mtime = config_mtime
+        now = time.monotonic()
+        if self._config and now - self._config_checked_at < self._config_check_interval:
+            return self._config
+            
+        self._config_checked_at = now
+        self._config = _load_config(self.config_path, os.path.getmtime(self.config_path))
         return self._config
         
     def set_credential_manager(self, credential_manager):
@@ -98,7 +95,7 @@ class MetadataHandler:
             should_defer = not node
         
         if should_defer:
-            layer.setCustomProperty('pending_metadata', json.dumps({
+            layer.setCustomProperty('pending_metadata', jsonutil.dumps({
                 'service_config': service_config,
                 'layer_config': layer_config
             }))
@@ -140,8 +137,7 @@ class MetadataHandler:
             
         # Set custom properties
         if 'custom_properties' in metadata:
-            for key, value in metadata['custom_properties'].items():
-                layer.setCustomProperty(key, value)
+            set_custom_properties(layer, metadata['custom_properties'])
                 
         # Apply metadata to layer
         layer.setMetadata(qmd)
@@ -151,26 +147,24 @@ class MetadataHandler:
         if not service_config and not layer_config:
             return None
             
-        metadata = {}
+        # Layer values take precedence over service values
+        sg = service_config.get if service_config else {}.get
+        lg = layer_config.get if layer_config else {}.get
         
-        # Combine service and layer metadata
-        if service_config:
-            metadata.update({
-                'identifier': service_config.get('id', ''),
-                'title': service_config.get('title', ''),
-                'abstract': service_config.get('description', ''),
-                'licenses': service_config.get('licenses', []),
-                'rights': service_config.get('rights', [])
-            })
-            
-        if layer_config:
-            metadata.update({
-                'identifier': layer_config.get('id', metadata.get('identifier', '')),
-                'title': layer_config.get('title', metadata.get('title', '')),
-                'abstract': layer_config.get('description', metadata.get('abstract', '')),
-                'extent': layer_config.get('extent', {}),
-                'temporal_extent': layer_config.get('temporal_extent', {}),
-                'custom_properties': layer_config.get('custom_properties', {})
-            })
+        identifier = lg('id') or sg('id') or ''
+        if isinstance(identifier, str):
+            identifier = sys.intern(identifier)
             
-        return metadata 
\ No newline at end of file
+        metadata = {
+            'identifier': identifier,
+            'title': lg('title') or sg('title'),
+            'abstract': lg('description') or sg('description'),
+            'licenses': sg('licenses'),
+            'rights': sg('rights'),
+            'extent': lg('extent'),
+            'temporal_extent': lg('temporal_extent'),
+            'custom_properties': lg('custom_properties')
+        }
+        
+        # Drop empty values so they are neither stored nor applied later
+        return {key: value for key, value in metadata.items() if value}
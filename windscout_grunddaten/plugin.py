@@ -74,11 +74,40 @@ from .tools import setup_logging
 def _get_combined_code_hash():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     py_files = sorted(glob.glob(os.path.join(base_dir, '**/*.py'), recursive=True))
-    md5 = hashlib.md5()
+    
+    # Cheap signature from file stats; the sources are only read again when it changes
+    stats = []
+    for fname in py_files:
+        st = os.stat(fname)
+        stats.append((os.path.relpath(fname, base_dir), st.st_mtime_ns, st.st_size))
+    # The algorithm is part of the signature so a hash cached by another version is not reused
+    signature = hashlib.blake2b(repr(('blake2b', stats)).encode(), digest_size=16).hexdigest()
+    
+    cache_file = os.path.join(base_dir, '.plugin_hash_cache.json')
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('signature') == signature:
+            return cached['hash']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+        
+    # BLAKE2b is faster than MD5 on 64-bit CPUs and ships with hashlib
+    digest = hashlib.blake2b(digest_size=16)
     for fname in py_files:
         with open(fname, 'rb') as f:
-            md5.update(f.read())
-    return md5.hexdigest()[:8]
+            digest.update(f.read())
+    code_hash = digest.hexdigest()[:8]
+    
+    # Replace the sidecar atomically; a read-only plugin directory just skips caching
+    try:
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'signature': signature, 'hash': code_hash}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return code_hash
 
 PLUGIN_CODE_VERSION = _get_combined_code_hash()
 
@@ -228,6 +257,8 @@ class QGISPlugin:
         # Try to load pre-configured credentials
         if not self.auth_manager.has_credentials():
             if self.auth_manager.load_preconfigured_credentials():
+                # The credentials file may have set a hostname
+                self.config_manager.invalidate_network_config()
                 self.logger.info("Successfully loaded pre-configured credentials")
                 self.iface.messageBar().pushMessage(
                     "Info", 
@@ -397,6 +428,8 @@ class QGISPlugin:
                 settings.setValue("ogc_layer_handler/auto_load_styles", auto_styles_checkbox.isChecked())
                 settings.setValue("ogc_layer_handler/layer_filter", layer_filter_input.text())
                 settings.setValue("ogc_layer_handler/profiling_enabled", profiling_checkbox.isChecked())
+                self.config_manager.invalidate_network_config()
+                self.metadata_client.invalidate_cache()
                 
                 # Save credentials
                 organization = organization_input.text()
@@ -93,14 +93,7 @@ class LayerService:
                 return None
                 
             # Get common settings
-            hostname = self.config_manager.get_hostname()
-            port = self.config_manager.get_port()
-            
-            if hostname in ['127.0.0.1', 'localhost']:
-                protocol = 'http'
-            else:
-                protocol = 'https'
-                port = '443'
+            base_url = self.config_manager.get_base_url()
                 
             # Get current map canvas settings
             if not self.iface:
@@ -137,16 +130,16 @@ class LayerService:
             
             if service_type == 'xyz_tiles':
                 layer = self._create_xyz_layer(
-                    hostname, port, service_config, layer_config, layer_name, auth_config_id
+                    base_url, service_config, layer_config, layer_name, auth_config_id
                 )
             elif service_type == 'WMS' and not is_internal:
                 layer = self._create_wms_layer(
-                    hostname, port, service_config, layer_config, layer_name, 
+                    base_url, service_config, layer_config, layer_name, 
                     auth_config_id, target_crs
                 )
             else:
                 layer = self._create_wfs_layer(
-                    hostname, port, service_config, layer_config, layer_name,
+                    base_url, service_config, layer_config, layer_name,
                     auth_config_id, target_crs
                 )
                 
@@ -184,15 +177,14 @@ class LayerService:
             self.logger.critical(traceback.format_exc())
             return None
             
-    def _create_xyz_layer(self, hostname: str, port: str, 
+    def _create_xyz_layer(self, base_url: str,
                          service_config: Dict, layer_config: Dict, 
                          layer_name: str, auth_config_id: str) -> QgsRasterLayer:
         """
         Create an XYZ tiles layer.
         
         Args:
-            hostname: Server hostname
-            port: Server port
+            base_url: Server base URL (protocol, hostname and port)
             service_config: Service configuration
             layer_config: Layer configuration
             layer_name: Layer name
@@ -201,12 +193,11 @@ class LayerService:
         Returns:
             QgsRasterLayer: Created layer
         """
-        protocol = 'https' if hostname not in ['127.0.0.1', 'localhost'] else 'http'
         proxy_path = service_config.get('proxy_path', '')
         
         # Construct the complete URL with placeholders and format extension
         tile_format = layer_config.get('format', 'png')
-        xyz_url = f"{protocol}://{hostname}:{port}{proxy_path}/{{z}}/{{x}}/{{y}}.{tile_format}"
+        xyz_url = f"{base_url}{proxy_path}/{{z}}/{{x}}/{{y}}.{tile_format}"
         
         # Add min and max zoom levels if specified
         zmin = layer_config.get('min_zoom', 0)
@@ -226,7 +217,7 @@ class LayerService:
         # Create the raster layer
         return QgsRasterLayer(uri_str, layer_name, "wms")
         
-    def _create_wms_layer(self, hostname: str, port: str,
+    def _create_wms_layer(self, base_url: str,
                          service_config: Dict, layer_config: Dict,
                          layer_name: str, auth_config_id: str,
                          target_crs) -> QgsRasterLayer:
@@ -234,8 +225,7 @@ class LayerService:
         Create a WMS layer.
         
         Args:
-            hostname: Server hostname
-            port: Server port
+            base_url: Server base URL (protocol, hostname and port)
             service_config: Service configuration
             layer_config: Layer configuration
             layer_name: Layer name
@@ -245,8 +235,7 @@ class LayerService:
         Returns:
             QgsRasterLayer: Created layer
         """
-        protocol = 'https' if hostname not in ['127.0.0.1', 'localhost'] else 'http'
-        service_url = f"{protocol}://{hostname}:{port}{service_config.get('proxy_path', '')}"
+        service_url = f"{base_url}{service_config.get('proxy_path', '')}"
         self.logger.info(f"WMS service URL: {service_url}")
         
         # Get layer details
@@ -263,23 +252,19 @@ class LayerService:
             "contextualWMSLegend": "0"
         }
         
-        # Build URI string directly with authentication
-        uri_components = []
-        for key, value in wms_params.items():
-            uri_components.append(f"{key}={value}")
-            
-        # Add authentication config ID separately
+        # Add authentication config ID last
         if auth_config_id:
-            uri_components.append(f"authcfg={auth_config_id}")
+            wms_params["authcfg"] = auth_config_id
             self.logger.info(f"Added auth config ID {auth_config_id} to WMS request")
         
-        wms_uri_string = "&".join(uri_components)
+        # Build URI string directly with authentication
+        wms_uri_string = "&".join(f"{key}={value}" for key, value in wms_params.items())
         self.logger.info(f"WMS URI: {wms_uri_string}")
         
         # Create WMS layer with the full URI string
         return QgsRasterLayer(wms_uri_string, layer_name, "wms")
         
-    def _create_wfs_layer(self, hostname: str, port: str,
+    def _create_wfs_layer(self, base_url: str,
                          service_config: Dict, layer_config: Dict,
                          layer_name: str, auth_config_id: str,
                          target_crs) -> QgsVectorLayer:
@@ -287,8 +272,7 @@ class LayerService:
         Create a WFS layer.
         
         Args:
-            hostname: Server hostname
-            port: Server port
+            base_url: Server base URL (protocol, hostname and port)
             service_config: Service configuration
             layer_config: Layer configuration
             layer_name: Layer name
@@ -298,19 +282,18 @@ class LayerService:
         Returns:
             QgsVectorLayer: Created layer
         """
-        protocol = 'https' if hostname not in ['127.0.0.1', 'localhost'] else 'http'
         is_internal = service_config.get('is_internal', False)
         region = service_config.get('region', '').lower()
         
         # For TinyOWS, construct type name with namespace (region:collection_id)
         if is_internal:
             type_name = f"{region}:{layer_config.get('id')}"
-            service_url = f"{protocol}://{hostname}:{port}/tinyows"
+            service_url = f"{base_url}/tinyows"
             wfs_version = "1.1.0"  # TinyOWS uses 1.1.0
         else:
             # For external services
             type_name = layer_config.get('type_name', '')
-            service_url = f"{protocol}://{hostname}:{port}{service_config.get('proxy_path', '')}"
+            service_url = f"{base_url}{service_config.get('proxy_path', '')}"
             wfs_version = "2.0.0"  # External services use 2.0.0
             
         self.logger.info(
@@ -400,8 +383,15 @@ class LayerService:
         layer_filter = self.config_manager.get_value("layer_filter", "")
         filter_ids = [lid.strip() for lid in layer_filter.split(',')] if layer_filter else None
         
+        # Country groups are top-level groups; index them once instead of
+        # searching the whole tree for every country
+        country_groups = {}
+        for child in root.children():
+            if isinstance(child, QgsLayerTreeGroup):
+                country_groups.setdefault(child.name(), child)
+                
         for country in self.config_manager.config.get('layer_tree', []):
-            country_group = root.findGroup(country.get('name'))
+            country_group = country_groups.get(country.get('name'))
             if not country_group:
                 continue
                 
@@ -416,6 +406,9 @@ class LayerService:
             layers.extend(service_layers.values())
             
         self.style_service.apply_deferred_styles(layers)
+        
+        # Apply deferred metadata, fetched for all layers in one batch
+        self.metadata_service.apply_deferred_metadata(layers)
                     
     def _process_group(self, group: Dict, parent_group, visible_only: bool = True,
                      filter_ids: List[str] = None) -> None:
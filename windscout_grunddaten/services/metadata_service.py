@@ -7,17 +7,59 @@ the domain logic and infrastructure components.
 import json
 import logging
 import os
-import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
-from qgis.core import QgsRasterLayer, QgsVectorLayer, QgsProject, QgsMapLayer
+from qgis.core import QgsApplication, QgsRasterLayer, QgsVectorLayer, QgsProject, QgsMapLayer, QgsTask
 
 from ..domain.models import LayerMetadata, ServiceConfig, LayerConfig
 from ..domain.metadata import MetadataProcessor
+from ..infrastructure.cache import DiskCache, TTLCache
 from ..infrastructure.config import ConfigManager
 from ..infrastructure.network import MetadataClient
 
 
+class MetadataFetchTask(QgsTask):
+    """
+    Background task fetching the metadata of several layers in one batch
+    
+    The requests wait in the task thread's own event loop, so the main
+    thread neither blocks nor dispatches user input in the middle of a
+    fetch. The callback runs on the main thread once the task is done.
+    """
+    
+    def __init__(self, metadata_client: MetadataClient, items: List[Tuple[Dict, str]], callback):
+        """
+        Initialize the task.
+        
+        Args:
+            metadata_client: Metadata client for fetching metadata
+            items: List of (service_config, collection_id) tuples
+            callback: Called with the list of results, in order
+        """
+        # A running batch of requests cannot be interrupted, so the task is not cancelable
+        super().__init__("Fetching layer metadata", QgsTask.Flags())
+        self.logger = logging.getLogger('qgis_plugin.metadata_service')
+        self.metadata_client = metadata_client
+        self.items = items
+        self.callback = callback
+        self.results = [None] * len(items)
+        self.exception = None
+        
+    def run(self) -> bool:
+        try:
+            self.results = self.metadata_client.fetch_metadata_many(self.items)
+            return True
+        except Exception as e:
+            # Exceptions must not escape a task thread
+            self.exception = e
+            return False
+            
+    def finished(self, result: bool) -> None:
+        if self.exception is not None:
+            self.logger.error(f"Error fetching deferred metadata: {str(self.exception)}")
+        self.callback(self.results)
+
+
 class MetadataService:
     """
     Service for handling layer metadata operations
@@ -39,12 +81,14 @@ class MetadataService:
         self.metadata_client = metadata_client
         self.metadata_processor = MetadataProcessor()
         
-        # Setup cache
-        cache_dir = os.path.join(os.path.expanduser('~'), '.qgis_metadata_cache')
-        os.makedirs(cache_dir, exist_ok=True)
-        self.cache_dir = cache_dir
-        self.memory_cache = {}
-        self.cache_times = {}
+        # Setup cache; the disk tier keeps metadata across QGIS restarts
+        self.cache_dir = os.path.join(os.path.expanduser('~'), '.qgis_metadata_cache')
+        self.memory_cache = TTLCache(maxsize=512, ttl=300)  # 5 minute TTL
+        self.disk_cache = DiskCache(self.cache_dir)
+        
+        # Running metadata fetch tasks; the task manager does not keep the
+        # Python wrappers alive on its own
+        self._tasks = set()
         
     def get_metadata(self, service_id: str, layer_id: str) -> Optional[LayerMetadata]:
         """
@@ -145,6 +189,129 @@ class MetadataService:
         # Apply custom properties
         self.metadata_processor.apply_custom_properties(layer, metadata)
     
+    def apply_deferred_metadata(self, layers: list) -> None:
+        """
+        Apply metadata to layers that were deferred during initial loading.
+        
+        The metadata of all pending layers is fetched with one concurrent
+        batch of requests in a background task and applied once it is done.
+        
+        Args:
+            layers: List of QGIS layers
+        """
+        pending = []
+        for layer in layers:
+            if not layer.isValid():
+                continue
+                
+            # Check if layer has pending metadata
+            pending_metadata = layer.customProperty('pending_metadata')
+            if not pending_metadata:
+                continue
+                
+            try:
+                pending_data = json.loads(pending_metadata)
+            except ValueError:
+                self.logger.warning(f"Failed to parse pending metadata for layer {layer.name()}")
+                continue
+                
+            # Layers are looked up again by ID later, as they may be removed meanwhile
+            pending.append((layer.id(), pending_data.get('service_id'), pending_data.get('layer_id')))
+            
+        if not pending:
+            return
+            
+        requests = self._pending_metadata_requests(
+            [(service_id, layer_id) for _, service_id, layer_id in pending]
+        )
+        if not requests:
+            self._apply_pending_metadata(pending)
+            return
+            
+        def on_fetched(results):
+            self._tasks.discard(task)
+            self._store_fetched_metadata(requests, results)
+            self._apply_pending_metadata(pending)
+            
+        task = MetadataFetchTask(
+            self.metadata_client,
+            [(service_config, layer_config.get('id')) for _, service_config, layer_config in requests],
+            on_fetched
+        )
+        self._tasks.add(task)
+        QgsApplication.taskManager().addTask(task)
+        
+    def _apply_pending_metadata(self, pending: List[Tuple[str, str, str]]) -> None:
+        """
+        Apply metadata to the deferred layers still in the project.
+        
+        Args:
+            pending: List of (QGIS layer ID, service_id, layer_id) tuples
+        """
+        project = QgsProject.instance()
+        for qgis_layer_id, service_id, layer_id in pending:
+            layer = project.mapLayer(qgis_layer_id)
+            if not layer:
+                continue
+                
+            try:
+                # Remove pending metadata property; applying defers again if needed
+                layer.removeCustomProperty('pending_metadata')
+                self.apply_metadata_to_layer(layer, service_id, layer_id)
+                
+            except Exception as e:
+                self.logger.error(f"Error applying deferred metadata: {str(e)}")
+                
+    def _pending_metadata_requests(self, layer_tasks: List[Tuple[str, str]]) -> List[Tuple[str, Dict, Dict]]:
+        """
+        Collect the layers whose metadata has to be requested from a service.
+        
+        Layers that are already cached or described by a metadata_mapping
+        need no request and are left to get_metadata.
+        
+        Args:
+            layer_tasks: List of (service_id, layer_id) tuples
+            
+        Returns:
+            List[Tuple[str, Dict, Dict]]: (cache_key, service_config, layer_config) per request
+        """
+        requests = []
+        seen = set()
+        for service_id, layer_id in layer_tasks:
+            cache_key = f"{service_id}_{layer_id}"
+            if cache_key in seen or self._get_from_cache(cache_key):
+                continue
+            seen.add(cache_key)
+                
+            service_config = self.config_manager.get_service_config(service_id)
+            if not service_config or 'metadata_mapping' in service_config:
+                continue
+                
+            layer_config = self.config_manager.get_layer_config(service_id, layer_id)
+            if not layer_config:
+                continue
+                
+            requests.append((cache_key, service_config, layer_config))
+            
+        return requests
+        
+    def _store_fetched_metadata(self, requests: List[Tuple[str, Dict, Dict]],
+                                results: List[Optional[Dict]]) -> None:
+        """
+        Cache the results of a batch fetch, so get_metadata finds them.
+        
+        Args:
+            requests: Requests from _pending_metadata_requests
+            results: Raw metadata or None per request, in order
+        """
+        for (cache_key, _, layer_config), raw_metadata in zip(requests, results):
+            if raw_metadata:
+                self._store_in_cache(cache_key, LayerMetadata.from_dict(raw_metadata))
+            else:
+                # Failed requests get the default metadata in memory only, so they
+                # are retried later rather than again on the main thread right away
+                self.memory_cache[cache_key] = self._default_metadata(layer_config)
+    
     def _prepare_metadata(self, service_config: Dict, layer_config: Dict) -> Optional[LayerMetadata]:
         """
         Prepare metadata from available sources.
@@ -163,22 +330,17 @@ class MetadataService:
             # First check if service has metadata_mapping
             if 'metadata_mapping' in service_config:
                 self.logger.info(f"Using metadata mapping from service config for {collection_id}")
+                mapping = service_config['metadata_mapping']
                 metadata = {
                     'id': collection_id,
-                    'title': layer_config.get('name', collection_id),
-                    'description': layer_config.get('description', f"Layer {collection_id}")
-                }
-                
-                # Add service-level metadata
-                mapping = service_config['metadata_mapping']
-                metadata.update({
-                    'title': mapping.get('title', metadata['title']),
-                    'description': mapping.get('description', metadata['description']),
+                    # Service-level metadata takes precedence over layer config
+                    'title': mapping.get('title', layer_config.get('name', collection_id)),
+                    'description': mapping.get('description', layer_config.get('description', f"Layer {collection_id}")),
                     'license': mapping.get('license'),
                     'attribution': mapping.get('author'),
                     'updated': mapping.get('updated'),
                     'data_uri': mapping.get('data_uri')
-                })
+                }
                 
                 return LayerMetadata.from_dict(metadata)
             
@@ -189,15 +351,28 @@ class MetadataService:
                     return LayerMetadata.from_dict(raw_metadata)
             
             # If all else fails, create minimal metadata
-            return LayerMetadata(
-                identifier=collection_id,
-                title=layer_config.get('name', collection_id),
-                abstract=layer_config.get('description', f"Layer {collection_id}")
-            )
+            return self._default_metadata(layer_config)
             
         except Exception as e:
             self.logger.error(f"Error preparing metadata: {str(e)}")
             return None
+            
+    def _default_metadata(self, layer_config: Dict) -> LayerMetadata:
+        """
+        Build minimal metadata from the layer configuration alone.
+        
+        Args:
+            layer_config: Layer configuration dictionary
+            
+        Returns:
+            LayerMetadata: Minimal metadata
+        """
+        collection_id = layer_config.get('id')
+        return LayerMetadata(
+            identifier=collection_id,
+            title=layer_config.get('name', collection_id),
+            abstract=layer_config.get('description', f"Layer {collection_id}")
+        )
     
     def _get_from_cache(self, key: str) -> Optional[LayerMetadata]:
         """
@@ -210,26 +385,21 @@ class MetadataService:
             LayerMetadata: Metadata or None if not found
         """
         # Check memory cache first
-        if key in self.memory_cache:
-            if time.time() - self.cache_times[key] < 300:  # 5 minute TTL
-                return self.memory_cache[key]
-            else:
-                del self.memory_cache[key]
-                del self.cache_times[key]
+        metadata = self.memory_cache.get(key)
+        if metadata is not None:
+            return metadata
                 
-        # Check disk cache
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
-        if os.path.exists(cache_file):
-            if time.time() - os.path.getmtime(cache_file) < 3600:  # 1 hour TTL
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                    metadata = LayerMetadata.from_dict(data)
-                    self.memory_cache[key] = metadata
-                    self.cache_times[key] = time.time()
-                    return metadata
-                except Exception as e:
-                    self.logger.warning(f"Failed to read metadata cache for {key}: {str(e)}")
+        # Check disk cache, a single indexed lookup
+        try:
+            data = self.disk_cache.get(key)
+            if data is not None:
+                metadata = LayerMetadata.from_dict(data)
+                self.memory_cache[key] = metadata
+                return metadata
+        except Exception as e:
+            self.logger.warning(f"Failed to read metadata cache for {key}: {str(e)}")
+            # Drop the entry so it is refetched and rewritten instead of failing on every lookup
+            self.disk_cache.delete(key)
                     
         return None
         
@@ -243,7 +413,6 @@ class MetadataService:
         """
         # Store in memory cache
         self.memory_cache[key] = metadata
-        self.cache_times[key] = time.time()
         
         # Prepare data for disk cache
         data = {
@@ -258,9 +427,7 @@ class MetadataService:
         }
         
         # Store on disk
-        cache_file = os.path.join(self.cache_dir, f"{key}.json")
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
+            self.disk_cache.set(key, data, expire=3600)  # 1 hour TTL
         except Exception as e:
             self.logger.warning(f"Failed to write metadata cache for {key}: {str(e)}") 
\ No newline at end of file
@@ -7,8 +7,8 @@ import logging
 from typing import Dict, Optional, List, Tuple
 import json
 import os
+import concurrent.futures
 from io import StringIO
-import base64
 from datetime import datetime
 
 from qgis.core import (
@@ -19,13 +19,15 @@ from qgis.core import (
     QgsRasterLayer,
     QgsVectorLayer,
     QgsProject,
-    QgsMapLayer
+    QgsMapLayer,
+    QgsReadWriteContext
 )
-from qgis.PyQt.QtCore import QUrl, QTemporaryFile, QByteArray
+from qgis.PyQt.QtCore import QUrl, QByteArray
 from qgis.PyQt.QtNetwork import QNetworkRequest, QNetworkReply
 from qgis.PyQt.QtXml import QDomDocument
 from qgis.PyQt.QtWidgets import QFileDialog
 
+from .. import jsonutil
 from ..infrastructure.config import ConfigManager
 
 
@@ -47,6 +49,8 @@ class StyleService:
         self.config_manager = config_manager
         self.network_client = None
         self.server_styles = {}
+        # layer identifier -> style key of server_styles, see _build_style_lookup
+        self.server_style_lookup = {}
 
     def set_network_client(self, network_client):
         """
@@ -94,6 +98,7 @@ class StyleService:
             
             # Flatten the styles structure for easier lookup
             self.server_styles = {}
+            self.server_style_lookup = {}
             
             # Process each style group
             for group_id, group_styles in styles_dict.items():
@@ -112,6 +117,7 @@ class StyleService:
                     else:
                         self.logger.warning(f"No QML content found for style {style_key}")
             
+            self.server_style_lookup = self._build_style_lookup(self.server_styles)
             self.logger.info(f"Successfully loaded {len(self.server_styles)} layer styles from server")
             
             # Apply styles to all loaded layers
@@ -126,23 +132,10 @@ class StyleService:
 
     def apply_styles_to_layers(self):
         """Apply loaded server styles to all layers in the project"""
-        project = QgsProject.instance()
+        styled_count = self._apply_styles_to_project_layers(
+            self.server_styles, self.server_style_lookup, "server", guess_source_id=True
+        )
         
-        # Get all map layers
-        all_layers = project.mapLayers()
-        styled_count = 0
-        
-        self.logger.info(f"Applying styles to {len(all_layers)} layers")
-        
-        for layer_id, layer in all_layers.items():
-            try:
-                # Try to find a matching style
-                style_applied = self._apply_server_style_to_layer(layer)
-                if style_applied:
-                    styled_count += 1
-            except Exception as e:
-                self.logger.warning(f"Error applying server style to layer {layer.name()}: {str(e)}")
-                
         self.logger.info(f"Applied server styles to {styled_count} layers")
         
         # Refresh the entire layer tree after all styles are applied
@@ -161,55 +154,141 @@ class StyleService:
         if not isinstance(layer, QgsMapLayer) or not self.server_styles:
             return False
         
+        # Try different matching strategies
+        best_match = self._match_style_key(layer, self.server_style_lookup, guess_source_id=True)
+        if best_match:
+            # Apply the matching style
+            style_data = self.server_styles[best_match]
+            success = self._apply_qml_style(layer, style_data['qml_content'])
+            
+            if success:
+                self.logger.info(f"Applied server style '{best_match}' to layer '{layer.name()}'")
+                return True
+            else:
+                self.logger.warning(f"Failed to apply server style '{best_match}' to layer '{layer.name()}'")
+                
+        return False
+        
+    def _apply_styles_to_project_layers(self, styles: Dict[str, Dict], lookup: Dict[str, str],
+                                        origin: str, guess_source_id: bool = False) -> int:
+        """
+        Apply the best matching style to every layer in the project.
+        
+        Matching and applying touch the layers and stay on the calling
+        thread; decoding and parsing the matched QML runs in a thread pool.
+        The caller is expected to refresh the entire layer tree afterwards.
+        
+        Args:
+            styles: Mapping of style key to style data
+            lookup: Mapping of layer identifier to style key
+            origin: Origin of the styles for log messages ("server" or "imported")
+            guess_source_id: Whether to derive a missing source_id from the layer name
+            
+        Returns:
+            int: Number of layers a style was applied to
+        """
+        all_layers = QgsProject.instance().mapLayers()
+        self.logger.info(f"Applying {origin} styles to {len(all_layers)} layers")
+        
+        matches = []
+        for layer in all_layers.values():
+            if not isinstance(layer, QgsMapLayer):
+                continue
+            try:
+                style_key = self._match_style_key(layer, lookup, guess_source_id)
+                if style_key:
+                    matches.append((layer, style_key))
+            except Exception as e:
+                self.logger.warning(f"Error matching {origin} style to layer {layer.name()}: {str(e)}")
+                
+        if not matches:
+            return 0
+            
+        # Each layer gets its own document, since importing may update it in place
+        max_workers = min(8, os.cpu_count() or 1, len(matches))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            documents = list(executor.map(
+                self._parse_qml,
+                [styles[style_key]['qml_content'] for _, style_key in matches]
+            ))
+            
+        styled_count = 0
+        for (layer, style_key), doc in zip(matches, documents):
+            try:
+                # The caller refreshes the whole layer tree in one walk afterwards,
+                # so no per-layer tree lookup is needed here
+                if doc is not None and self._apply_qml_document(layer, doc, refresh_tree=False):
+                    self.logger.info(f"Applied {origin} style '{style_key}' to layer '{layer.name()}'")
+                    styled_count += 1
+                else:
+                    self.logger.warning(f"Failed to apply {origin} style '{style_key}' to layer '{layer.name()}'")
+            except Exception as e:
+                self.logger.warning(f"Error applying {origin} style to layer {layer.name()}: {str(e)}")
+                
+        return styled_count
+        
+    def _match_style_key(self, layer, lookup: Dict[str, str], guess_source_id: bool = False) -> Optional[str]:
+        """
+        Find the best matching style for a layer from its custom properties.
+        
+        Args:
+            layer: QGIS layer
+            lookup: Mapping of layer identifier to style key
+            guess_source_id: Whether to derive a missing source_id from the layer name
+            
+        Returns:
+            str: Style key or None if no style matches
+        """
         # Get layer properties to match with styles
         source_id = layer.customProperty('source_id', '')
         type_name = layer.customProperty('type_name', '')
         layer_name = layer.name()
         
         # If source_id is empty, try to extract from name
-        if not source_id:
+        if not source_id and guess_source_id:
             # Some heuristics to extract potential IDs from layer names
             parts = layer_name.split(':')
             if len(parts) > 1:
                 source_id = parts[-1].strip()
                 
-        # Try different matching strategies
-        potential_matches = []
+        return self._find_style_key(lookup, layer_name, type_name, source_id)
         
-        # 1. Direct match by layer name (lowest priority)
-        for style_key, style_data in self.server_styles.items():
-            if style_data['layer'] == layer_name:
-                potential_matches.append((style_key, 1))  # Priority 1
-                
-        # 2. Match by type_name if available (medium priority)
-        if type_name:
-            for style_key, style_data in self.server_styles.items():
-                if style_data['layer'] == type_name:
-                    potential_matches.append((style_key, 2))  # Priority 2
-                    
-        # 3. Match by source_id if available (highest priority)
-        if source_id:
-            for style_key, style_data in self.server_styles.items():
-                if style_data['layer'] == source_id:
-                    potential_matches.append((style_key, 3))  # Priority 3
-                    
-        # Get the highest priority match
-        if potential_matches:
-            # Sort by priority (highest last)
-            potential_matches.sort(key=lambda x: x[1])
-            best_match = potential_matches[-1][0]
+    @staticmethod
+    def _build_style_lookup(styles: Dict[str, Dict]) -> Dict[str, str]:
+        """
+        Index flattened styles by the layer identifier they apply to.
+        
+        When several groups style the same identifier, the last one wins.
+        
+        Args:
+            styles: Mapping of "group:layer" style key to style data
             
-            # Apply the matching style
-            style_data = self.server_styles[best_match]
-            success = self._apply_qml_style(layer, style_data['qml_content'])
+        Returns:
+            Dict[str, str]: Mapping of layer identifier to style key
+        """
+        return {style_data['layer']: style_key for style_key, style_data in styles.items()}
+        
+    @staticmethod
+    def _find_style_key(lookup: Dict[str, str], layer_name: str, type_name: str, source_id: str) -> Optional[str]:
+        """
+        Find the best matching style for a layer in a style lookup.
+        
+        A match by source_id takes precedence over one by type_name, which
+        takes precedence over one by layer name.
+        
+        Args:
+            lookup: Mapping of layer identifier to style key
+            layer_name: Layer name
+            type_name: Type name (may be empty)
+            source_id: Source ID (may be empty)
             
-            if success:
-                self.logger.info(f"Applied server style '{best_match}' to layer '{layer.name()}'")
-                return True
-            else:
-                self.logger.warning(f"Failed to apply server style '{best_match}' to layer '{layer.name()}'")
-                
-        return False
+        Returns:
+            str: Style key or None if no style matches
+        """
+        for identifier in (source_id, type_name, layer_name):
+            if identifier and identifier in lookup:
+                return lookup[identifier]
+        return None
         
     def _apply_qml_style(self, layer, qml_base64: str) -> bool:
         """
@@ -219,31 +298,61 @@ class StyleService:
             layer: QGIS layer
             qml_base64: QML style content as base64 encoded string
             
+        Returns:
+            bool: True if style was successfully applied
+        """
+        doc = self._parse_qml(qml_base64)
+        if doc is None:
+            return False
+        return self._apply_qml_document(layer, doc)
+        
+    def _parse_qml(self, qml_base64: str) -> Optional[QDomDocument]:
+        """
+        Decode and parse base64 encoded QML style content.
+        
+        Does not touch any layer, so it may run on a worker thread.
+        
+        Args:
+            qml_base64: QML style content as base64 encoded string
+            
+        Returns:
+            QDomDocument: Parsed style or None if the content is invalid
+        """
+        try:
+            # Parse the QML in memory instead of going through a temporary file
+            doc = QDomDocument("qgis")
+            parsed, message, _, _ = doc.setContent(QByteArray.fromBase64(QByteArray(qml_base64.encode('ascii'))))
+            if not parsed:
+                self.logger.warning(f"Failed to parse QML style: {message}")
+                return None
+            return doc
+        except Exception as e:
+            self.logger.error(f"Error parsing QML style: {str(e)}")
+            return None
+            
+    def _apply_qml_document(self, layer, doc: QDomDocument, refresh_tree: bool = True) -> bool:
+        """
+        Apply a parsed QML style to a layer.
+        
+        Args:
+            layer: QGIS layer
+            doc: Parsed QML style
+            refresh_tree: Whether to refresh the layer's node in the layer tree
+            
         Returns:
             bool: True if style was successfully applied
         """
         try:
-            # Create a temporary file for the QML content
-            temp_file = QTemporaryFile()
-            if temp_file.open():
-                # Decode base64 directly to bytes and write
-                temp_file.write(base64.b64decode(qml_base64))
-                temp_file.flush()
-                
-                # Load style from the temp file
-                message, result = layer.loadNamedStyle(temp_file.fileName(), categories = QgsMapLayer.Symbology)
-                temp_file.close()
-                
-                if result:
-                    # Trigger repaint and refresh layer tree
-                    layer.triggerRepaint()
+            result, message = layer.importNamedStyle(doc, QgsMapLayer.Symbology)
+            
+            if result:
+                # Trigger repaint and refresh layer tree
+                layer.triggerRepaint()
+                if refresh_tree:
                     self._refresh_layer_tree_symbology(layer)
-                    return True
-                else:
-                    self.logger.warning(f"Failed to load style: {message}")
-                    return False
+                return True
             else:
-                self.logger.error("Could not open temporary file for QML content")
+                self.logger.warning(f"Failed to load style: {message}")
                 return False
                 
         except Exception as e:
@@ -260,25 +369,17 @@ class StyleService:
             layer: QGIS layer that was styled
         """
         try:
-            # Get the layer tree root
-            root = QgsProject.instance().layerTreeRoot()
-            
-            # Find the layer node in the tree
-            layer_node = root.findLayer(layer.id())
-            if layer_node:
-                # Force refresh of the layer tree node
-                layer_node.setItemVisibilityChecked(layer_node.itemVisibilityChecked())
-                
-            # Also refresh the entire layer tree model
+            # Refresh the layer's legend in the layer tree view
             from qgis.utils import iface
             if iface and hasattr(iface, 'layerTreeView'):
                 layer_tree_view = iface.layerTreeView()
                 if layer_tree_view and hasattr(layer_tree_view, 'refreshLayerSymbology'):
                     layer_tree_view.refreshLayerSymbology(layer.id())
                 elif layer_tree_view and hasattr(layer_tree_view, 'model'):
-                    # Force model refresh
+                    # Force model refresh; only this fallback needs the layer's tree node
                     model = layer_tree_view.model()
-                    if model:
+                    layer_node = QgsProject.instance().layerTreeRoot().findLayer(layer.id())
+                    if model and layer_node:
                         model.refreshLayerLegend(layer_node)
                         
         except Exception as e:
@@ -464,12 +565,13 @@ class StyleService:
         # Try config manager first
         return self.config_manager.get_style_config(layer_id, type_name)
 
-    def export_styles_to_file(self, parent_widget=None) -> bool:
+    def export_styles_to_file(self, parent_widget=None, pretty: bool = False) -> bool:
         """
         Export all layer styles to a JSON file.
         
         Args:
             parent_widget: Parent widget for file dialog
+            pretty: Whether to indent the JSON for reading; compact by default
             
         Returns:
             bool: True if export was successful
@@ -495,16 +597,23 @@ class StyleService:
                 self.logger.warning("No layers found in project")
                 return False
                 
-            # Build export structure
+            # Build export structure; all styles share the export timestamp
+            exported_at = datetime.now().isoformat()
             export_data = {
                 "version": "1.0",
-                "exported_date": datetime.now().isoformat(),
+                "exported_date": exported_at,
                 "plugin": "windscout_grunddaten",
                 "styles": {}
             }
             
             exported_count = 0
             
+            # Services used to group styles, looked up once instead of per layer
+            group_services = [
+                service_id for service_id in ["mastr_energy", "grid_data", "geo_data"]  # Common groups
+                if self.config_manager.get_service_config(service_id)
+            ]
+            
             for layer_id, layer in all_layers.items():
                 try:
                     # Skip raster layers for now
@@ -516,20 +625,18 @@ class StyleService:
                     source_id = layer.customProperty('source_id', '')
                     type_name = layer.customProperty('type_name', '')
                     
-                    # Export the layer's current style as QML
+                    # Export the layer's current style as base64 encoded QML
                     qml_content = self._export_layer_qml(layer)
                     if qml_content:
                         # Determine grouping (use source service or 'custom')
                         group_name = "custom"
                         if source_id:
                             # Try to determine group from source_id
-                            service_config = None
-                            for service_id in ["mastr_energy", "grid_data", "geo_data"]:  # Common groups
-                                if self.config_manager.get_service_config(service_id):
-                                    layer_config = self.config_manager.get_layer_config(service_id, source_id)
-                                    if layer_config:
-                                        group_name = service_id
-                                        break
+                            for service_id in group_services:
+                                layer_config = self.config_manager.get_layer_config(service_id, source_id)
+                                if layer_config:
+                                    group_name = service_id
+                                    break
                         
                         # Ensure group exists
                         if group_name not in export_data["styles"]:
@@ -544,8 +651,8 @@ class StyleService:
                             "layer_id": layer_id,
                             "source_id": source_id,
                             "type_name": type_name,
-                            "qml_content": base64.b64encode(qml_content.encode('utf-8')).decode('ascii'),
-                            "exported_at": datetime.now().isoformat()
+                            "qml_content": qml_content,
+                            "exported_at": exported_at
                         }
                         
                         exported_count += 1
@@ -555,9 +662,13 @@ class StyleService:
                     self.logger.warning(f"Failed to export style for layer {layer.name()}: {str(e)}")
                     continue
                     
-            # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            # Write to file; the styles are base64 encoded, so indentation only adds bytes
+            if pretty:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(export_data, f, indent=2, ensure_ascii=False)
+            else:
+                with open(file_path, 'wb') as f:
+                    f.write(jsonutil.dumpb(export_data))
                 
             self.logger.info(f"Successfully exported {exported_count} layer styles to {file_path}")
             return True
@@ -570,41 +681,26 @@ class StyleService:
             
     def _export_layer_qml(self, layer) -> Optional[str]:
         """
-        Export a layer's style as QML string.
+        Export a layer's style as base64 encoded QML.
+        
+        The style is serialized and encoded in memory, without a temporary
+        file or an intermediate Python string.
         
         Args:
             layer: QGIS layer
             
         Returns:
-            str: QML content or None if export failed
+            str: Base64 encoded QML content or None if export failed
         """
         try:
-            # Create temporary file for QML export
-            temp_file = QTemporaryFile()
-            if temp_file.open():
-                temp_file_path = temp_file.fileName()
-                temp_file.close()
-                
-                # Export style to temporary file
-                message, result = layer.saveNamedStyle(temp_file_path, categories = QgsMapLayer.Symbology)
-                
-                if result:
-                    # Read QML content from file
-                    with open(temp_file_path, 'r', encoding='utf-8') as f:
-                        qml_content = f.read()
-                    
-                    # Clean up
-                    try:
-                        os.remove(temp_file_path)
-                    except:
-                        pass
-                        
-                    return qml_content
-                else:
-                    self.logger.warning(f"Failed to export layer style: {message}")
-                    return None
+            doc = QDomDocument("qgis")
+            message = layer.exportNamedStyle(doc, QgsReadWriteContext(), QgsMapLayer.Symbology)
+            
+            if not message:
+                # Same UTF-8 bytes and indentation saveNamedStyle writes to a .qml file
+                return bytes(doc.toByteArray(2).toBase64()).decode('ascii')
             else:
-                self.logger.error("Could not create temporary file for QML export")
+                self.logger.warning(f"Failed to export layer style: {message}")
                 return None
                 
         except Exception as e:
@@ -634,9 +730,9 @@ class StyleService:
                 self.logger.info("Import cancelled by user")
                 return False
                 
-            # Read file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
+            # Read file; parsed from bytes, which orjson handles without a decode pass
+            with open(file_path, 'rb') as f:
+                import_data = jsonutil.loads(f.read())
                 
             # Validate structure
             if 'styles' not in import_data:
@@ -665,6 +761,7 @@ class StyleService:
             
             # Store imported styles (they will take precedence over server styles)
             self.imported_styles = imported_styles
+            self.imported_style_lookup = self._build_style_lookup(imported_styles)
             
             # Apply to current layers
             self._apply_imported_styles_to_layers()
@@ -683,21 +780,10 @@ class StyleService:
         if not hasattr(self, 'imported_styles') or not self.imported_styles:
             return
             
-        project = QgsProject.instance()
-        all_layers = project.mapLayers()
-        styled_count = 0
-        
-        self.logger.info(f"Applying imported styles to {len(all_layers)} layers")
+        styled_count = self._apply_styles_to_project_layers(
+            self.imported_styles, self.imported_style_lookup, "imported"
+        )
         
-        for layer_id, layer in all_layers.items():
-            try:
-                # Try to find a matching imported style
-                style_applied = self._apply_imported_style_to_layer(layer)
-                if style_applied:
-                    styled_count += 1
-            except Exception as e:
-                self.logger.warning(f"Error applying imported style to layer {layer.name()}: {str(e)}")
-                
         self.logger.info(f"Applied imported styles to {styled_count} layers")
         
         # Refresh the entire layer tree after all styles are applied
@@ -716,37 +802,9 @@ class StyleService:
         if not isinstance(layer, QgsMapLayer) or not hasattr(self, 'imported_styles') or not self.imported_styles:
             return False
         
-        # Get layer properties to match with styles
-        source_id = layer.customProperty('source_id', '')
-        type_name = layer.customProperty('type_name', '')
-        layer_name = layer.name()
-        
         # Try different matching strategies (same as server styles)
-        potential_matches = []
-        
-        # 1. Direct match by layer name (lowest priority)
-        for style_key, style_data in self.imported_styles.items():
-            if style_data['layer'] == layer_name:
-                potential_matches.append((style_key, 1))
-                
-        # 2. Match by type_name if available (medium priority)
-        if type_name:
-            for style_key, style_data in self.imported_styles.items():
-                if style_data['layer'] == type_name:
-                    potential_matches.append((style_key, 2))
-                    
-        # 3. Match by source_id if available (highest priority)
-        if source_id:
-            for style_key, style_data in self.imported_styles.items():
-                if style_data['layer'] == source_id:
-                    potential_matches.append((style_key, 3))
-                    
-        # Get the highest priority match
-        if potential_matches:
-            # Sort by priority (highest last)
-            potential_matches.sort(key=lambda x: x[1])
-            best_match = potential_matches[-1][0]
-            
+        best_match = self._match_style_key(layer, self.imported_style_lookup)
+        if best_match:
             # Apply the matching style
             style_data = self.imported_styles[best_match]
             success = self._apply_qml_style(layer, style_data['qml_content'])
@@ -766,15 +824,18 @@ class StyleService:
             if iface and hasattr(iface, 'layerTreeView'):
                 layer_tree_view = iface.layerTreeView()
                 if layer_tree_view:
-                    # Get the model and refresh it
-                    model = layer_tree_view.model()
-                    if model and hasattr(model, 'refreshLayerLegend'):
-                        # Refresh legend for all layers
-                        root = QgsProject.instance().layerTreeRoot()
-                        for layer in QgsProject.instance().mapLayers().values():
-                            layer_node = root.findLayer(layer.id())
-                            if layer_node:
-                                model.refreshLayerLegend(layer_node)
+                    # Refresh legend for all layers; findLayers walks the tree once
+                    # instead of searching it again for every layer. The view's
+                    # model() is a proxy without refreshLayerLegend on QGIS >= 3.18,
+                    # so go through the view or its layer tree model instead
+                    root = QgsProject.instance().layerTreeRoot()
+                    if hasattr(layer_tree_view, 'refreshLayerSymbology'):
+                        for layer_node in root.findLayers():
+                            layer_tree_view.refreshLayerSymbology(layer_node.layerId())
+                    elif hasattr(layer_tree_view, 'layerTreeModel'):
+                        model = layer_tree_view.layerTreeModel()
+                        for layer_node in root.findLayers():
+                            model.refreshLayerLegend(layer_node)
                                 
                     # Force a full refresh of the view
                     layer_tree_view.model().layoutChanged.emit()